@@ -0,0 +1,57 @@
+"""Benchmark ``import ubcpdk`` wall time and peak memory.
+
+Each measurement runs in a fresh interpreter, for the eager and lazy modes::
+
+    python benchmarks/bench_import.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+script = """
+import json, time, tracemalloc
+tracemalloc.start()
+t0 = time.perf_counter()
+import ubcpdk
+{access}
+t1 = time.perf_counter()
+print(json.dumps(dict(seconds=t1 - t0, peak_mb=tracemalloc.get_traced_memory()[1] / 2**20)))
+"""
+
+
+def measure(lazy: bool, access: str = "", repeat: int = 5) -> dict[str, float]:
+    """Returns median import time and peak memory over repeat fresh processes."""
+    env = dict(os.environ, UBCPDK_LAZY="1" if lazy else "0")
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", script.format(access=access)],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        key: statistics.median(run[key] for run in runs)
+        for key in ("seconds", "peak_mb")
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = {
+        "eager": dict(lazy=False),
+        "lazy": dict(lazy=True),
+        "lazy + PDK": dict(lazy=True, access="ubcpdk.PDK"),
+    }
+    for name, kwargs in cases.items():
+        r = measure(repeat=args.repeat, **kwargs)
+        print(f"{name:12s} {r['seconds']:8.3f} s {r['peak_mb']:8.1f} MB")
@@ -0,0 +1,34 @@
+"""Benchmark Monte-Carlo variability with JAX against the process pool backend.
+
+python benchmarks/bench_monte_carlo.py --samples 100000 --circuit ring_single
+"""
+
+import argparse
+import time
+
+from ubcpdk.simulation.monte_carlo import figures, monte_carlo, summarize
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--circuit", default="mzi", choices=list(figures))
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    monte_carlo(args.circuit, n=args.samples, backend="jax")  # compile
+
+    timings = {}
+    for backend, max_workers in [
+        ("jax", None),
+        ("process", 1),
+        ("process", args.max_workers),
+    ]:
+        t0 = time.perf_counter()
+        df = monte_carlo(
+            args.circuit, n=args.samples, backend=backend, max_workers=max_workers
+        )
+        timings[f"{backend} max_workers={max_workers}"] = time.perf_counter() - t0
+
+    print(summarize(df))
+    for name, t in timings.items():
+        print(f"{name:30} {t * 1e3:10.2f} ms")
@@ -0,0 +1,58 @@
+"""Benchmark batched JAX MZI spectra against a NumPy loop over mzi_spectrum.
+
+python benchmarks/bench_mzi_jax.py --batch 4096 --points 2001
+"""
+
+import argparse
+import time
+
+import jax
+import numpy as np
+
+from ubcpdk.simulation.circuits import mzi_spectrum
+from ubcpdk.simulation.circuits.jax_models import mzi_spectrum_batch, param_names
+
+
+def timeit(f, repeat: int = 3) -> float:
+    """Returns best wall time of f() in seconds."""
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=4096)
+    parser.add_argument("--points", type=int, default=2001)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    w = np.linspace(1.5, 1.6, args.points)
+    params = dict(
+        L1_um=rng.uniform(0, 50, args.batch),
+        L2_um=rng.uniform(100, 300, args.batch),
+        alpha=rng.uniform(1e-4, 1e-3, args.batch),
+        n1=rng.uniform(2.3, 2.5, args.batch),
+        n2=rng.uniform(-1.2, -0.9, args.batch),
+        n3=np.zeros(args.batch),
+    )
+
+    def numpy_loop():
+        return np.stack(
+            [
+                mzi_spectrum(wavelength_um=w, **{k: params[k][i] for k in param_names})
+                for i in range(args.batch)
+            ]
+        )
+
+    jparams = {k: jax.numpy.asarray(v) for k, v in params.items()}
+    jw = jax.numpy.asarray(w)
+    mzi_spectrum_batch(jparams, jw).block_until_ready()  # compile
+
+    t_numpy = timeit(numpy_loop)
+    t_jax = timeit(lambda: mzi_spectrum_batch(jparams, jw).block_until_ready())
+    print(f"numpy loop {t_numpy * 1e3:10.2f} ms")
+    print(f"jax vmap   {t_jax * 1e3:10.2f} ms  ({t_numpy / t_jax:.1f}x)")
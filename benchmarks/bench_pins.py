@@ -0,0 +1,79 @@
+"""Benchmark the SiEPIC DEVREC and pin post-processing of add_pins_bbox_siepic.
+
+Adds DEVREC boxes and pins to n straights built by gf.cell, as when cells
+are rebuilt after clearing the cell cache or in worker processes, and to a
+parent cell with n instances of one straight. Compares the previous
+implementation (flattened ``c.layers`` checks and one add_pin_path call per
+port) with the current one (layers read once per unique cell and DEVREC, pins
+and labels added in one call)::
+
+    python benchmarks/bench_pins.py -n 10000
+"""
+
+import argparse
+import gc
+import time
+
+import gdsfactory as gf
+
+from ubcpdk.tech import LAYER, add_pins_bbox_siepic, add_pins_siepic
+
+
+def add_pins_bbox_siepic_reference(component: gf.Component) -> gf.Component:
+    """Previous add_pins_bbox_siepic with its default arguments."""
+    c = component
+    if LAYER.DEVREC not in c.layers:
+        c.add_padding(default=0, layers=(LAYER.DEVREC,))
+    if LAYER.PORT not in c.layers:
+        c = add_pins_siepic(component=c, layer_pin=LAYER.PORT)
+    return c
+
+
+def straights(n: int) -> list[gf.Component]:
+    """Returns n unlocked gf.cell straights without pins."""
+    return [
+        gf.components.straight(length=1 + i * 1e-3, cross_section="xs_sc").copy()
+        for i in range(n)
+    ]
+
+
+def array(n: int) -> gf.Component:
+    """Returns a parent with n instances of a straight."""
+    c = gf.Component()
+    straight = gf.components.straight(length=10, cross_section="xs_sc")
+    for i in range(n):
+        ref = c << straight
+        ref.movey(i * 2)
+    c.add_port("o1", port=c.references[0].ports["o1"])
+    c.add_port("o2", port=c.references[-1].ports["o2"])
+    return c
+
+
+def measure(function, components) -> float:
+    """Returns seconds to call function on components, without GC like timeit."""
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        for c in components:
+            function(c)
+        return time.perf_counter() - t0
+    finally:
+        gc.enable()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=10000)
+    args = parser.parse_args()
+
+    for name, function in {
+        "reference": add_pins_bbox_siepic_reference,
+        "current": add_pins_bbox_siepic,
+    }.items():
+        gf.clear_cache()
+        seconds = measure(function, straights(args.n))
+        print(f"{name:10s} {args.n} straights {seconds:8.3f} s")
+
+        gf.clear_cache()
+        seconds = measure(function, [array(args.n)])
+        print(f"{name:10s} array of {args.n} {seconds:8.3f} s")
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config: pytest.Config) -> None:
+    """Keeps the ubcpdk caches of the tests out of ~/.cache/ubcpdk.
+
+    The cache directory is set in the environment before any test module
+    imports ubcpdk, since importing ubcpdk already writes the layer views
+    cache and worker processes only inherit the environment.
+    """
+    cache_dir = config._tmp_path_factory.mktemp("ubcpdk_cache")
+    os.environ["UBCPDK_CACHE_DIR"] = str(cache_dir)
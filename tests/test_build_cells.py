@@ -0,0 +1,28 @@
+import pytest
+from gdsfactory.cell import CACHE
+
+from ubcpdk.build_cells import build_cells
+
+
+@pytest.fixture
+def restore_cell_cache():
+    """Restores the gdsfactory cell cache after the test."""
+    cache = dict(CACHE)
+    yield
+    CACHE.clear()
+    CACHE.update(cache)
+
+
+def test_build_cells(restore_cell_cache) -> None:
+    names = ["straight", "coupler", "ebeam_crossing4", "not_a_cell"]
+    components, report, failures = build_cells(names, max_workers=2)
+    assert set(components) == {"straight", "coupler", "ebeam_crossing4"}
+    assert set(report.index) == set(components)
+    assert list(failures) == ["not_a_cell"]
+
+    expected, _, _ = build_cells(names[:3], max_workers=1)
+    for name, c in components.items():
+        assert c.name == expected[name].name
+        assert list(c.ports) == list(expected[name].ports)
+        assert c.function_name == expected[name].function_name
+        assert c.to_dict(with_ports=False) == expected[name].to_dict(with_ports=False)
@@ -0,0 +1,44 @@
+import gdsfactory as gf
+from gdsfactory.cell import CACHE
+
+from ubcpdk.cache import LRUCache, component_cache
+
+
+def test_lru_cache() -> None:
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3  # evicts b, the least recently used
+    assert "b" not in cache
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["size"] == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_maxbytes() -> None:
+    cache = LRUCache(maxsize=None, maxbytes=10, sizeof=len)
+    cache["a"] = "xxxx"
+    cache["b"] = "xxxx"
+    cache["c"] = "xxxx"
+    assert list(cache._data) == ["b", "c"]
+    assert cache.nbytes == 8
+
+
+def test_component_cache() -> None:
+    @component_cache(maxsize=1)
+    def straight(length: float = 1.0) -> gf.Component:
+        return gf.components.straight(length=length)
+
+    c1 = straight(length=1.234)
+    assert straight(length=1.234) is c1
+    assert CACHE.get(c1.name) is c1
+
+    straight(length=2.345)  # evicts c1 from both caches
+    assert CACHE.get(c1.name) is None
+    assert straight.cache_info()["evictions"] == 1
+    assert straight.__wrapped__(length=1.234) is not c1
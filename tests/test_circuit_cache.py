@@ -0,0 +1,59 @@
+from functools import partial
+
+import gdsfactory as gf
+import jax.numpy as jnp
+
+import ubcpdk
+from ubcpdk import PDK
+from ubcpdk.simulation import circuit_cache
+from ubcpdk.simulation.circuit_cache import (
+    circuits,
+    clear_circuit_cache,
+    get_circuit,
+)
+
+
+def test_get_circuit() -> None:
+    clear_circuit_cache()
+    c = ubcpdk.components.mzi(delta_length=20)
+    circuit, _ = get_circuit(c, models=PDK.models)
+    assert get_circuit(c, models=PDK.models)[0] is circuit
+    assert get_circuit(c.get_netlist(), models=PDK.models)[0] is circuit
+    assert circuits.stats()["hits"] == 2
+
+    models = dict(PDK.models)
+    assert get_circuit(c, models=models)[0] is circuit
+    models["straight"] = partial(models["straight"])
+    assert get_circuit(c, models=models)[0] is not circuit
+    assert len(circuits) == 2
+
+
+def test_get_circuit_rebuilt_component() -> None:
+    """A rebuilt component with the same name gets a new circuit."""
+    clear_circuit_cache()
+    c1 = ubcpdk.components.mzi(delta_length=20)
+    circuit1, _ = get_circuit(c1, models=PDK.models)
+
+    gf.clear_cache()
+    c2 = ubcpdk.components.mzi(delta_length=20)
+    assert c2.name == c1.name and c2 is not c1
+    assert get_circuit(c2, models=PDK.models)[0] is circuit1
+
+    c3 = gf.Component(c1.name)
+    c3 << ubcpdk.components.straight(length=10)
+    c3.add_ports(c3.references[0].ports)
+    circuit3, _ = get_circuit(c3, models=PDK.models)
+    assert circuit3 is not circuit1
+    wl = jnp.linspace(1.5, 1.6, 11)
+    assert set(circuit3(wl=wl)) != set(circuit1(wl=wl))
+
+
+def test_get_circuit_lru(monkeypatch) -> None:
+    monkeypatch.setattr(circuit_cache, "circuits", type(circuits)(maxsize=1))
+    c1 = ubcpdk.components.mzi(delta_length=10)
+    c2 = ubcpdk.components.mzi(delta_length=20)
+    circuit1, _ = get_circuit(c1, models=PDK.models, jit=False)
+    get_circuit(c2, models=PDK.models, jit=False)
+    assert len(circuit_cache.circuits) == 1
+    assert get_circuit(c1, models=PDK.models, jit=False)[0] is not circuit1
+    assert circuit_cache.circuits.stats()["hits"] == 0
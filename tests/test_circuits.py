@@ -0,0 +1,71 @@
+import numpy as np
+
+from ubcpdk.simulation.circuits import beta, mzi_spectrum, neff
+from ubcpdk.simulation.circuits.waveguide import get_wavelength_um
+
+
+def test_mzi_spectrum_fused() -> None:
+    w = np.linspace(1.5, 1.6, 1001)
+    kwargs = dict(alpha=2e-3, n1=2.44, n2=-1.1, n3=0.1)
+    b = beta(w, **kwargs)
+    expected = 0.25 * np.abs(np.exp(-1j * b * 40) + np.exp(-1j * b * 255)) ** 2
+
+    np.testing.assert_allclose(mzi_spectrum(40, 255, w, **kwargs), expected)
+    np.testing.assert_allclose(mzi_spectrum(40, 255, w, beta=b), expected)
+
+    out = np.empty_like(w)
+    assert mzi_spectrum(40, 255, w, out=out, **kwargs) is out
+    np.testing.assert_allclose(out, expected)
+
+
+def test_wavelength_grid_cache() -> None:
+    assert get_wavelength_um() is get_wavelength_um()
+    assert get_wavelength_um().size == 100000
+    np.testing.assert_allclose(neff(), neff(get_wavelength_um()))
+
+
+def test_mzi_spectrum_jax() -> None:
+    import jax.numpy as jnp
+
+    from ubcpdk.simulation.circuits.jax_models import (
+        mzi_mse_value_and_grad,
+        mzi_spectrum_batch,
+        sweep_params,
+    )
+
+    w = np.linspace(1.5, 1.6, 501)
+    params = sweep_params(L2_um=[100.0, 200.0], n1=[2.4, 2.45])
+    spectra = mzi_spectrum_batch(params, jnp.asarray(w))
+    assert spectra.shape == (4, w.size)
+
+    for i in range(4):
+        kwargs = {k: float(v[i]) for k, v in params.items()}
+        np.testing.assert_allclose(
+            spectra[i], mzi_spectrum(wavelength_um=w, **kwargs), atol=1e-3
+        )
+
+    value, grad = mzi_mse_value_and_grad(params, jnp.asarray(w), spectra)
+    np.testing.assert_allclose(value, 0, atol=1e-6)
+    assert grad["n1"].shape == (4,)
+
+
+def test_monte_carlo() -> None:
+    from ubcpdk.simulation.monte_carlo import figures, monte_carlo
+
+    for circuit in figures:
+        df_jax = monte_carlo(circuit, n=1000, backend="jax")
+        df_numpy = monte_carlo(circuit, n=1000, backend="process", max_workers=1)
+        assert len(df_jax) == 1000
+        np.testing.assert_allclose(df_jax["fsr_nm"], df_numpy["fsr_nm"], rtol=1e-4)
+        assert np.all(df_numpy["fsr_nm"] > 0)
+        assert np.median(df_numpy["extinction_ratio"]) > 0
+
+
+def test_monte_carlo_geometry() -> None:
+    """The geometry follows the cells, delta_length only lengthens one arm."""
+    from ubcpdk.simulation.monte_carlo import get_geometry
+
+    geometry = get_geometry("mzi")
+    assert geometry["delta_length"] == 10
+    assert geometry == {**get_geometry("mzi", delta_length=40), "delta_length": 10}
+    assert get_geometry("ring_single", radius=5)["radius"] == 5
@@ -0,0 +1,188 @@
+import warnings
+
+import numpy as np
+import pytest
+import scipy.signal as sig
+
+from ubcpdk.config import PATH
+from ubcpdk.data import (
+    chop,
+    extract_resonances,
+    extract_resonances_batch,
+    find_bandwidths,
+    fit_mzi,
+    fit_mzi_batch,
+    read_mat,
+    read_mat_batch,
+    remove_baseline,
+    remove_baseline_batch,
+    windowed_mean,
+    windowed_mean_stream,
+)
+from ubcpdk.data.dbr import dbrs
+from ubcpdk.data.fit_mzi import normalize_spectrum
+from ubcpdk.data.store import parse_filename, write_store
+from ubcpdk.simulation.circuits import mzi_spectrum
+
+
+def test_read_mat_batch(tmp_path) -> None:
+    bad = tmp_path / "bad.mat"
+    bad.write_text("not a mat file")
+    files = dict(dbr1_1=dbrs["1_1"], dbr1_2=dbrs["1_2"], bad=bad)
+
+    df, failures = read_mat_batch(files, port=1, max_workers=1)
+    assert set(failures) == {"bad"}
+    assert list(df.device.cat.categories) == ["dbr1_1", "dbr1_2"]
+
+    w, p = read_mat(dbrs["1_2"], port=1)
+    d = df[df.device == "dbr1_2"]
+    assert (d.wavelength.values == w).all()
+    assert (d.power.values == p).all()
+
+
+def test_measurement_store(tmp_path) -> None:
+    files = [dbrs["1_1"], dbrs["1_2"]]
+    store = write_store(files, port=[0, 1], dirpath=tmp_path, max_workers=1)
+    assert len(store.entries) == 4
+
+    for filename in files:
+        w0, p0 = read_mat(filename, port=1, store=None)
+        w1, p1 = read_mat(filename, port=1, store=tmp_path)
+        assert (w0 == w1).all() and (p0 == p1).all()
+
+    df = store.to_pandas(columns=["power"])
+    assert set(df.Num) == {1, 2}
+
+    old = sorted(tmp_path.glob("*.npy"))
+    store = write_store(dbrs["1_10"], port=1, dirpath=tmp_path, max_workers=1)
+    assert len(store.entries) == 5
+    new = sorted(tmp_path.glob("*.npy"))
+    assert len(new) == 4 and set(old) <= set(new)
+    write_store(dbrs["1_10"], port=1, dirpath=tmp_path, max_workers=1)
+    assert not set(old) & set(tmp_path.glob("*.npy"))
+    w0, p0 = read_mat(files[0], port=1, store=None)
+    w1, p1 = read_mat(files[0], port=1, store=tmp_path)
+    assert (w0 == w1).all() and (p0 == p1).all()
+    assert parse_filename(dbrs["1_10"])["BraggSet"] == 1
+
+
+def test_find_bandwidths() -> None:
+    x = np.linspace(1.5, 1.6, 101)
+    centers = np.array([1.53, 1.55, 1.57])
+    sigma = 0.01
+    y = -10 * np.log10(np.e) * (x - centers[:, None]) ** 2 / (2 * sigma**2)
+
+    bandwidth, center, peak = find_bandwidths(x, y, threshold=3)
+    expected = 2 * sigma * np.sqrt(2 * 3 / (10 * np.log10(np.e)))
+    np.testing.assert_allclose(bandwidth, expected, rtol=1e-2)
+    np.testing.assert_allclose(center, centers, atol=1e-3)
+    np.testing.assert_allclose(peak, 0, atol=1e-12)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        bandwidth, center, peak = find_bandwidths(x, np.zeros((2, x.size)))
+    assert np.isnan(bandwidth).all()
+    assert np.isnan(center).all()
+
+
+def test_windowed_mean() -> None:
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=(3, 1000))
+    n = 7
+    box = np.ones(2 * n + 1)
+    expected = sig.convolve(y[0], box, mode="same") / sig.convolve(
+        np.ones_like(y[0]), box, mode="same"
+    )
+    np.testing.assert_allclose(windowed_mean(y[0], n), expected)
+    np.testing.assert_allclose(windowed_mean(y, n, axis=1)[0], expected)
+
+    chunks = np.array_split(y, [5, 6, 300, 301, 700], axis=-1)
+    streamed = np.concatenate(list(windowed_mean_stream(chunks, n)), axis=-1)
+    np.testing.assert_allclose(streamed, windowed_mean(y, n, axis=-1))
+
+
+def test_remove_baseline_batch() -> None:
+    rng = np.random.default_rng(0)
+    w = np.linspace(1.5e-6, 1.6e-6, 500)
+    p = rng.normal(size=(4, w.size)) + 10 * np.sin(w * 1e7)
+    corrected = remove_baseline_batch(w, p)
+    for row, expected in zip(p, corrected):
+        np.testing.assert_allclose(remove_baseline(w, row), expected, atol=1e-6)
+
+
+def test_chop() -> None:
+    x = np.linspace(-1, 1, 21)
+    y = np.vstack([x**2, x**3])
+
+    xc, yc = chop(x, y[0], xmin=0, ymax=0.5)
+    assert (xc > 0).all() and (yc < 0.5).all() and len(xc) == 7
+
+    xs, ys = chop(x, y, xmin=-0.5, xmax=0.5, is_sorted=True)
+    xm, ym = chop(x, y, xmin=-0.5, xmax=0.5)
+    assert np.shares_memory(ys, y)
+    np.testing.assert_array_equal(xs, xm)
+    np.testing.assert_array_equal(ys, ym)
+
+
+def test_extract_resonances() -> None:
+    wavelength = np.linspace(1.5e-6, 1.6e-6, 20001)
+    resonances = 1.505e-6 + 10e-9 * np.arange(10)
+    hwhm = 0.05e-9
+    t = np.prod(
+        1 - 0.9 / (1 + ((wavelength[:, None] - resonances) / hwhm) ** 2), axis=1
+    )
+    df = extract_resonances(wavelength, 10 * np.log10(t), length=60e-6)
+
+    np.testing.assert_allclose(df.wavelength, resonances, rtol=1e-6)
+    np.testing.assert_allclose(df.fwhm, 2 * hwhm, rtol=1e-2)
+    np.testing.assert_allclose(df.extinction_ratio, 10, rtol=1e-2)
+    np.testing.assert_allclose(df.fsr[:-1], 10e-9, rtol=1e-3)
+    assert np.all(df.r2 > 0.999)
+
+
+def test_extract_resonances_measurement() -> None:
+    """Ring measurements, through port dips and drop port peaks."""
+    files = {f.stem.split("_")[1]: f for f in PATH.ring.glob("*.mat")}
+    df, failures = extract_resonances_batch(files, max_workers=2)
+    assert not failures
+    ng = df.groupby("device").ng.median()
+    assert set(ng.index) == set(files)
+    assert ng.filter(like="TE").between(4.0, 4.3).all()
+    assert ng.filter(like="TM").between(3.2, 3.5).all()
+    fsr = df.groupby("device").fsr.median()
+    np.testing.assert_allclose(fsr["RingDoubleTER3g100"], 30.7e-9, rtol=0.05)
+
+    df, failures = extract_resonances_batch(
+        {"drop": PATH.ring_te_r10_g100}, port=0, max_workers=1, kind="peak"
+    )
+    assert len(df) >= 10
+    assert df.ng.median() == pytest.approx(4.15, rel=0.02)
+
+
+def test_fit_mzi() -> None:
+    w = np.linspace(1.5, 1.6, 2001)
+    expected = dict(n1=2.44, n2=-1.1, alpha=2e-3)
+    power = mzi_spectrum(0, 100, w, **expected)
+
+    r = fit_mzi(w, power, L1_um=0, L2_um=100, n1=2.443)
+    for key, value in expected.items():
+        np.testing.assert_allclose(r[key], value, rtol=1e-3)
+
+
+def test_fit_mzi_measurement() -> None:
+    """Measured spectrum in nm with -inf dB dropouts."""
+    wavelength, power = read_mat(PATH.mzi4, port=0, store=None)
+    w, power = normalize_spectrum(wavelength, power)
+    assert 1.5 < w.min() < w.max() < 1.6
+    assert np.all(np.isfinite(power))
+
+    r = fit_mzi(w, power, L1_um=0, L2_um=207.08945)
+    assert 4.0 < r["ng"] < 4.4
+    fsr_um = 1.55**2 / (r["ng"] * 207.08945)
+    np.testing.assert_allclose(r["fsr_um"], fsr_um, rtol=0.05)
+
+    files = dict(mzi4=PATH.mzi4, unknown=PATH.mzi4)
+    df, failures = fit_mzi_batch(files, dict(mzi4=(0, 207.08945)), max_workers=1)
+    assert list(df.index) == ["mzi4"]
+    assert isinstance(failures["unknown"], KeyError)
+    assert df.loc["mzi4", "ng"] == pytest.approx(r["ng"])
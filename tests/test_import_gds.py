@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import gdsfactory as gf
+import gdstk
+import numpy as np
+from gdsfactory.cell import CACHE
+
+import ubcpdk
+from ubcpdk.config import PATH
+from ubcpdk.import_gds import (
+    find_label,
+    get_label_index,
+    import_gds,
+    match_labels,
+    remove_pins_recursive,
+)
+from ubcpdk.tech import LAYER, add_pins_bbox_siepic
+
+
+def test_import_gds_disk_cache(tmp_path, monkeypatch) -> None:
+    """Cached imports keep the ports recovered from the SiEPIC pins."""
+    monkeypatch.setattr(PATH, "import_gds_cache", tmp_path)
+    c1 = import_gds.__wrapped__("ebeam_y_1550.gds")
+    assert list(tmp_path.glob("*.json"))
+
+    # read twice from disk, the second import is in the gdsfactory cell cache
+    c2 = import_gds.__wrapped__("ebeam_y_1550.gds")
+    assert import_gds.__wrapped__("ebeam_y_1550.gds") is c2
+
+    # not in the gdsfactory cell cache, as in a new process
+    for key in [key for key, c in CACHE.items() if c is c2]:
+        monkeypatch.delitem(CACHE, key)
+    c3 = import_gds.__wrapped__("ebeam_y_1550.gds")
+    assert c3 is not c2
+    assert list(c1.ports) == list(c3.ports)
+    for name, port in c1.ports.items():
+        assert tuple(port.center) == tuple(c3.ports[name].center)
+        assert port.orientation == c3.ports[name].orientation
+        assert port.width == c3.ports[name].width
+
+    # entries of another ubcpdk release are not reused
+    monkeypatch.setattr(ubcpdk, "__version__", "0.0.0")
+    import_gds.__wrapped__("ebeam_y_1550.gds")
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_find_label() -> None:
+    labels = [
+        SimpleNamespace(origin=(x * 10.0, y * 10.0), text=f"opt{x}_{y}")
+        for x in range(100)
+        for y in range(100)
+    ]
+    index = get_label_index(labels)
+    used: set[int] = set()
+    assert find_label(index, labels, [(500.0004, 20.0)], used=used).text == "opt50_2"
+    assert find_label(index, labels, [(500.0, 20.0)], used=used) is None
+    assert find_label(index, labels, [(1.0, 1.0), (0.0, 10.0)]).text == "opt0_1"
+
+
+def test_match_labels() -> None:
+    """Pins take the label of their first candidate, each label at most once."""
+    labels = [
+        SimpleNamespace(origin=(x * 10.0, y * 10.0), text=f"opt{x}_{y}")
+        for x in range(100)
+        for y in range(100)
+    ]
+    points = np.array(
+        [
+            [(500.0004, 20.0), (0.0, 0.0)],
+            [(500.0, 20.0), (1.0, 1.0)],
+            [(1.0, 1.0), (0.0, 10.0)],
+            [(1.0, 1.0), (2.0, 2.0)],
+        ]
+    )
+    matches = match_labels(labels, points)
+    assert [labels[i].text if i >= 0 else None for i in matches] == [
+        "opt50_2",
+        None,
+        "opt0_1",
+        None,
+    ]
+    assert list(match_labels([], points)) == [-1] * 4
+
+
+def test_remove_pins_recursive() -> None:
+    """Shared subcells are copied once and the original cells are not modified."""
+    straight = gf.components.straight(cross_section="xs_sc").copy()
+    straight = add_pins_bbox_siepic(straight)
+    row = gf.Component()
+    for i in range(10):
+        row.add_ref(straight).movey(2 * i)
+    top = gf.Component()
+    for i in range(10):
+        top.add_ref(row).movex(20 * i)
+    layers = {LAYER.DEVREC, LAYER.PORT}
+    assert layers <= top.layers
+
+    memo = {}
+    c = remove_pins_recursive(top, memo=memo)
+    assert len(memo) == 3
+    assert not layers & c.layers
+    assert layers <= top.layers
+    assert {id(ref.parent) for ref in c.references} == {id(memo[id(row)][1])}
+    assert c.name == f"{top.name}_no_pins"
+    assert c not in CACHE.values()
+
+
+def test_remove_pins_recursive_write_gds(tmp_path) -> None:
+    """The original and the copy without pins are distinct cells in one GDS."""
+    straight = ubcpdk.components.straight(length=5)
+    top = gf.Component("top")
+    top << straight
+    top << remove_pins_recursive(straight)
+    gdspath = top.write_gds(tmp_path / "top.gds")
+
+    cells = {cell.name: cell for cell in gdstk.read_gds(gdspath).cells}
+    pinned = cells[straight.name]
+    no_pins = cells[f"{straight.name}_no_pins"]
+    layers = {LAYER.DEVREC, LAYER.PORT}
+    assert len(pinned.paths) == 2
+    assert not no_pins.paths
+    assert not layers & {(p.layer, p.datatype) for p in no_pins.polygons}
+    assert {ref.cell.name for ref in cells[top.name].references} == {
+        pinned.name,
+        no_pins.name,
+    }
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+from ubcpdk.config import PATH
+
+script = """
+import sys
+import ubcpdk
+from gdsfactory.pdk import get_active_pdk
+
+assert "ubcpdk.components" not in sys.modules
+pdk = ubcpdk.PDK
+assert get_active_pdk() is pdk and pdk.name == "ubcpdk"
+assert "ubcpdk.components" in sys.modules
+assert "straight" in pdk.cells
+"""
+
+
+def test_lazy_import() -> None:
+    """With UBCPDK_LAZY=1 the cells are imported on first access of the PDK."""
+    env = dict(os.environ, UBCPDK_LAZY="1")
+    subprocess.run([sys.executable, "-c", script], env=env, cwd=PATH.repo, check=True)
@@ -0,0 +1,20 @@
+import json
+
+from ubcpdk import cells
+from ubcpdk.profiler import CellProfiler
+
+
+def test_cell_profiler(tmp_path) -> None:
+    straight = cells["straight"]
+    with CellProfiler() as profiler:
+        cells["straight"](length=11.123)
+        cells["straight"](length=11.123)
+    assert cells["straight"] is straight
+
+    report = profiler.report()
+    assert report.loc["straight", "calls"] == 2
+    assert report.loc["straight", "cache_hits"] >= 1
+
+    profiler.write_chrome_trace(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert [e["name"] for e in trace["traceEvents"]] == ["straight", "straight"]
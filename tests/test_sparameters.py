@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from ubcpdk.config import PATH
+from ubcpdk.simulation import sparameters
+from ubcpdk.simulation.sparameters import build_index, load_sparameters, split_stem
+
+
+def test_split_stem() -> None:
+    assert split_stem("ebeam_crossing4_7e264905_524beede") == (
+        "ebeam_crossing4_7e264905",
+        "524beede",
+    )
+    assert split_stem("rotate_f258530e_49a8fbc1") == ("rotate_f258530e", "49a8fbc1")
+    assert split_stem("ebeam_y_1550_20634f71", name="ebeam_y_1550") == (
+        "ebeam_y_1550",
+        "20634f71",
+    )
+    assert split_stem("gc_te1550") == ("gc_te1550", "")
+
+
+def test_index_names(tmp_path) -> None:
+    """Names come from the YAML component name, or the stem without its hash."""
+    index = build_index(PATH.sparameters, cache_dir=tmp_path)
+    assert index.get("rotate_f258530e").name == "rotate_f258530e"
+    assert len(index.find("rotate_f258530e")) == 33
+    assert len(index.find("mirror_948d7eaf_gc_te1550")) == 10
+    assert len(index.find("ebeam_crossing4_7e264905")) == 3
+    entry = index.get("ebeam_y_1550", settings_hash="20634f71")
+    assert entry.filepath == "ebeam_y_1550_20634f71.npz"
+
+
+def test_index_cache(tmp_path, monkeypatch) -> None:
+    """The second build reads the JSON index instead of the YAML files."""
+    index = build_index(PATH.sparameters, cache_dir=tmp_path)
+    entry = index.get("ebeam_y_1550")
+    assert entry.filepath.endswith(".npz")
+    assert entry.num_ports == 3
+    assert entry.wavelength_min == 1.5
+
+    def fail(*args, **kwargs):
+        raise AssertionError("index rebuilt")
+
+    monkeypatch.setattr(sparameters, "_read_entry", fail)
+    assert build_index(PATH.sparameters, cache_dir=tmp_path).entries == index.entries
+
+
+def test_load_sparameters(tmp_path) -> None:
+    index = build_index(PATH.sparameters, cache_dir=tmp_path)
+    for name in ["ebeam_y_1550", "bend_euler_radius3"]:
+        for entry in index.find(name):
+            sp = load_sparameters(entry, cache_dir=tmp_path)
+            assert sp["wavelengths"].size == entry.wavelength_points
+            assert np.iscomplexobj(sp["o1@0,o2@0"])
+            assert np.all(np.abs(sp["o1@0,o2@0"]) <= 1.01)
+
+
+def test_sparameters_model() -> None:
+    import importlib
+
+    import jax.numpy as jnp
+
+    # ubcpdk.models is the dict of registered models, import the module itself
+    models = importlib.import_module("ubcpdk.models")
+
+    index = build_index(PATH.sparameters)
+    sp = load_sparameters(index.get("ebeam_y_1550", settings_hash="1f494ca0"))
+    wavelengths = np.asarray(sp["wavelengths"])
+
+    S = models.ebeam_y_1550(wl=jnp.asarray(wavelengths))
+    np.testing.assert_allclose(S["o1", "o2"], sp["o1@0,o2@0"], rtol=1e-4, atol=1e-5)
+
+    S = models.gc_te1550(wl=jnp.linspace(1.5, 1.6, 11))
+    assert ("o1", "o2") in S
+    assert S["o1", "o2"].shape == (11,)
+
+
+def test_sparameters_model_geometry() -> None:
+    """Parametric cells only use data simulated for their settings."""
+    import jax.numpy as jnp
+
+    import ubcpdk
+    from ubcpdk import PDK
+    from ubcpdk.simulation.circuit_cache import get_circuit
+
+    wl = jnp.linspace(1.5, 1.6, 11)
+    circuit, _ = get_circuit(ubcpdk.components.ring_single(gap=0.2, radius=5))
+    assert circuit(wl=wl)["o1", "o2"].shape == (11,)
+
+    with pytest.raises(ValueError, match="gap=0.2"):
+        PDK.models["coupler_ring"](wl=wl, gap=0.1)
+    circuit, _ = get_circuit(ubcpdk.components.ring_single(gap=0.1, radius=5))
+    with pytest.raises(ValueError, match="gap=0.2"):
+        circuit(wl=wl)
@@ -0,0 +1,92 @@
+from functools import partial
+
+import gdsfactory as gf
+import numpy as np
+from gdsfactory.add_pins import add_pin_path
+
+from ubcpdk.config import PATH
+from ubcpdk.tech import (
+    LAYER,
+    add_pins_bbox_siepic,
+    get_hierarchy_layers,
+    get_layer_views,
+)
+
+
+def test_get_hierarchy_layers() -> None:
+    c = gf.Component()
+    c << gf.components.mmi1x2(cross_section="xs_sc")
+    c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=LAYER.DEVREC)
+    assert get_hierarchy_layers(c) == c.layers
+
+
+def test_add_pins_bbox_siepic() -> None:
+    """Pins match gdsfactory add_pin_path."""
+    c1 = gf.Component()
+    c1 << gf.components.mmi1x2(cross_section="xs_sc")
+    c1.add_ports(c1.references[0].ports)
+    c2 = c1.copy()
+
+    add_pins_bbox_siepic(c1)
+    add_pins_bbox_siepic(c2, function=partial(add_pin_path))
+
+    assert LAYER.DEVREC in c1.layers
+    np.testing.assert_allclose(
+        c1.get_polygons(by_spec=LAYER.DEVREC), c2.get_polygons(by_spec=LAYER.DEVREC)
+    )
+    paths1, paths2 = c1._cell.paths, c2._cell.paths
+    assert len(paths1) == len(paths2) == len(c1.ports)
+    for p1, p2 in zip(paths1, paths2):
+        np.testing.assert_array_equal(p1.spine(), p2.spine())
+        assert p1.layers == p2.layers
+    assert [label.text for label in c1.labels] == [label.text for label in c2.labels]
+
+
+def test_add_pins_bbox_siepic_same_name() -> None:
+    """Cells with the same name and bounding box get pins at their own ports."""
+    components = []
+    for orientation in (0, 90):
+        c = gf.Component("same_name")
+        c.add_polygon([(0, 0), (1, 0), (1, 1), (0, 1)], layer=LAYER.WG)
+        c.add_port(
+            "o1", center=(0.5, 0.5), width=0.5, orientation=orientation, layer=LAYER.WG
+        )
+        components.append(add_pins_bbox_siepic(c))
+
+    spines = [c._cell.paths[0].spine() for c in components]
+    assert not np.allclose(spines[0], spines[1])
+    for c, spine in zip(components, spines):
+        port = c.ports["o1"]
+        c2 = gf.Component()
+        add_pin_path(c2, port=port, layer=LAYER.PORT, pin_length=10e-3)
+        np.testing.assert_allclose(spine, c2._cell.paths[0].spine())
+
+
+def test_get_layer_views_cache(tmp_path, monkeypatch) -> None:
+    """Cached LayerViews match the YAML and are rebuilt when it changes."""
+    # without the in-process cache, as in a new process
+    load = get_layer_views.__wrapped__
+    filepath = tmp_path / "layers.yaml"
+    filepath.write_text(PATH.lyp_yaml.read_text())
+    cache_dir = tmp_path / "cache"
+    layer_views = load(filepath, cache_dir=None)
+
+    assert load(filepath, cache_dir=cache_dir) == layer_views
+    (cache_path,) = cache_dir.glob("*.pkl")
+
+    # read back from the cache without parsing the YAML
+    with monkeypatch.context() as m:
+        m.setattr(gf.technology, "LayerViews", None)
+        assert load(filepath, cache_dir=cache_dir) == layer_views
+
+    # a corrupt cache falls back to the YAML and is rewritten
+    cache_path.write_bytes(b"corrupt")
+    assert load(filepath, cache_dir=cache_dir) == layer_views
+    assert cache_path.read_bytes() != b"corrupt"
+
+    filepath.write_text(filepath.read_text().replace("#ff9d9d", "#000000", 1))
+    changed = load(filepath, cache_dir=cache_dir)
+    assert changed.layer_views["Waveguide"].fill_color != (
+        layer_views.layer_views["Waveguide"].fill_color
+    )
+    assert len(list(cache_dir.glob("*.pkl"))) == 2
@@ -1,23 +1,20 @@
-"""UBC Siepic Ebeam PDK from edx course."""
+"""UBC Siepic Ebeam PDK from edx course.
+
+Set ``UBCPDK_LAZY=1`` (or ``lazy: true`` in ``config.yml``) to resolve
+``cells``, ``models``, ``LAYER_VIEWS``, ``data``, ``components`` and ``PDK``
+on first access instead of at import time.
+"""
+
+import functools
+import importlib
 
 from gdsfactory.config import PATH as GPATH
 from gdsfactory.get_factories import get_cells
 from gdsfactory.pdk import Pdk
 
-from ubcpdk import components, data, tech
+from ubcpdk import tech
 from ubcpdk.config import CONFIG, PATH
-from ubcpdk.tech import LAYER, LAYER_STACK, LAYER_VIEWS, cross_sections
-
-try:
-    from gplugins.sax.models import get_models
-
-    from ubcpdk import models
-
-    models = get_models(models)
-except ImportError:
-    print("gplugins[sax] not installed, no simulation models available.")
-    models = {}
-
+from ubcpdk.tech import LAYER, LAYER_STACK, cross_sections
 
 __version__ = "2.5.0"
 
@@ -28,30 +25,85 @@ __all__ = [
     "components",
     "tech",
     "LAYER",
+    "LAYER_VIEWS",
     "cells",
     "cross_sections",
+    "get_pdk",
     "PDK",
     "__version__",
 ]
 
 
-cells = get_cells(components)
-PDK = Pdk(
-    name="ubcpdk",
-    cells=cells,
-    cross_sections=cross_sections,
-    models=models,
-    layers=dict(LAYER),
-    layer_stack=LAYER_STACK,
-    layer_views=LAYER_VIEWS,
-)
+@functools.cache
+def _get_cells() -> dict:
+    return get_cells(importlib.import_module("ubcpdk.components"))
+
+
+@functools.cache
+def _get_models() -> dict:
+    try:
+        from gplugins.sax.models import get_models
+
+        models = get_models(importlib.import_module("ubcpdk.models"))
+    except ImportError:
+        print("gplugins[sax] not installed, no simulation models available.")
+        models = {}
+    # importing the submodule binds ubcpdk.models to it, expose the dict instead
+    globals()["models"] = models
+    return models
+
+
+@functools.cache
+def get_pdk() -> Pdk:
+    """Returns the active UBC PDK, building and activating it on first call."""
+    pdk = Pdk(
+        name="ubcpdk",
+        cells=_get_cells(),
+        cross_sections=cross_sections,
+        models=_get_models(),
+        layers=dict(LAYER),
+        layer_stack=LAYER_STACK,
+        layer_views=tech.get_layer_views(),
+    )
+    pdk.activate()
+    return pdk
+
 
 GPATH.sparameters = PATH.sparameters
 GPATH.interconnect = PATH.interconnect_cml_path
-PDK.activate()
+
+
+if CONFIG.get("lazy", False):
+
+    def __getattr__(name: str):
+        if name == "PDK":
+            value = get_pdk()
+        elif name == "cells":
+            get_pdk()
+            value = _get_cells()
+        elif name == "components":
+            get_pdk()
+            value = importlib.import_module(f"{__name__}.components")
+        elif name == "models":
+            value = _get_models()
+        elif name == "LAYER_VIEWS":
+            value = tech.get_layer_views()
+        elif name == "data":
+            value = importlib.import_module(f"{__name__}.data")
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        globals()[name] = value
+        return value
+
+else:
+    from ubcpdk import components, data
+    from ubcpdk.tech import LAYER_VIEWS
+
+    models = _get_models()
+    cells = _get_cells()
+    PDK = get_pdk()
 
 
 if __name__ == "__main__":
-    m = get_models(models)
-    for model in m.keys():
+    for model in _get_models().keys():
         print(model)
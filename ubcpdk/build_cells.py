@@ -0,0 +1,154 @@
+"""Parallel generation of PDK cells.
+
+Cells are built in a process pool. Each worker returns the GDS bytes, ports and
+info of its cell together with build and write times. The parent imports the
+GDS and adds the components to the gdsfactory cell cache, so later calls to the
+same factories with the same arguments return them without building again.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import gdsfactory as gf
+import pandas as pd
+from gdsfactory.cell import CACHE
+from gdsfactory.component import CellSettings, Component
+from gdsfactory.serialization import clean_value_json
+
+from ubcpdk.cache import temporary_path
+from ubcpdk.config import PATH
+from ubcpdk.import_gds import add_ports_from_json, get_ports_json
+
+
+def _get_cells() -> dict:
+    import ubcpdk
+
+    ubcpdk.get_pdk()
+    return ubcpdk._get_cells()
+
+
+def _build_cell(name: str) -> tuple[Component, float]:
+    """Returns (component, build time in s) of a cell factory."""
+    factory = _get_cells()[name]
+    t0 = time.perf_counter()
+    c = factory()
+    return c, time.perf_counter() - t0
+
+
+def _build_cell_gds(name: str) -> dict[str, Any]:
+    """Builds a cell in a worker, returns its GDS bytes and metadata."""
+    c, build_time = _build_cell(name)
+    t0 = time.perf_counter()
+    gdspath = temporary_path(PATH.cache / "build_cells", suffix=".gds")
+    try:
+        c.write_gds(gdspath=gdspath)
+        gds = gdspath.read_bytes()
+    finally:
+        gdspath.unlink(missing_ok=True)
+    return dict(
+        name=c.name,
+        gds=gds,
+        ports=get_ports_json(c),
+        info=clean_value_json(dict(c.info)),
+        settings=clean_value_json(dict(c.settings)),
+        function_name=c.function_name,
+        module=c.module,
+        build_time=build_time,
+        write_time=time.perf_counter() - t0,
+    )
+
+
+def load_cell(result: dict[str, Any]) -> Component:
+    """Returns component from the GDS bytes and metadata of a worker.
+
+    The settings, function name and module of the factory are restored, and
+    the component is added to the gdsfactory cell cache unless a cell with the
+    same name is already there, which is returned instead.
+    """
+    if result["name"] in CACHE:
+        return CACHE[result["name"]]
+
+    gdspath = temporary_path(PATH.cache / "build_cells", suffix=".gds")
+    try:
+        gdspath.write_bytes(result["gds"])
+        c = gf.import_gds(gdspath, cellname=result["name"])
+    finally:
+        gdspath.unlink(missing_ok=True)
+    add_ports_from_json(c, result["ports"])
+    c.info.update(result["info"])
+    c.settings = CellSettings(**result["settings"])
+    c.function_name = result["function_name"]
+    c.module = result["module"]
+    CACHE[c.name] = c
+    return c
+
+
+def build_cells(
+    names: Iterable[str] | None = None,
+    max_workers: int | None = None,
+) -> tuple[dict[str, Component], pd.DataFrame, dict[str, Exception]]:
+    """Builds PDK cells across a process pool.
+
+    Returns (cell name to component, timing report, cell name to exception
+    for failed cells). The report has one row per cell sorted by build time.
+
+    Args:
+        names: names of ubcpdk.cells. Defaults to all cells.
+        max_workers: number of worker processes, 1 builds in this process.
+    """
+    names = list(_get_cells() if names is None else names)
+    components: dict[str, Component] = {}
+    failures: dict[str, Exception] = {}
+    rows = []
+
+    if max_workers == 1:
+        for name in names:
+            try:
+                c, build_time = _build_cell(name)
+            except Exception as e:
+                failures[name] = e
+                continue
+            components[name] = c
+            rows.append(dict(cell=name, name=c.name, build_time=build_time))
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as executor:
+            futures = {name: executor.submit(_build_cell_gds, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failures[name] = e
+                    continue
+                t0 = time.perf_counter()
+                components[name] = load_cell(result)
+                rows.append(
+                    dict(
+                        cell=name,
+                        name=result["name"],
+                        build_time=result["build_time"],
+                        write_time=result["write_time"],
+                        load_time=time.perf_counter() - t0,
+                        gds_bytes=len(result["gds"]),
+                    )
+                )
+
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        report = report.sort_values("build_time", ascending=False).set_index("cell")
+    return components, report, failures
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    components, report, failures = build_cells()
+    print(report.head(20))
+    print(f"{len(components)} cells in {time.perf_counter() - t0:.1f} s")
+    print(f"{len(failures)} failed: {sorted(failures)}")
@@ -0,0 +1,251 @@
+"""Cache helpers.
+
+On-disk entries are written to a temporary file in the destination directory and
+then atomically renamed, so concurrent readers never see a partially written file.
+``LRUCache`` is a bounded in-memory cache, and ``component_cache`` uses it to
+memoize component functions within ``CONFIG.cache_maxsize`` entries and
+``CONFIG.cache_maxbytes`` of polygon data.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from gdsfactory.cell import CACHE
+from gdsfactory.typings import PathType
+
+from ubcpdk.config import CONFIG
+
+
+def file_hash(filepath: PathType, chunk_size: int = 1 << 20) -> str:
+    """Returns the sha256 hex digest of a file contents."""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def text_hash(*parts: Any) -> str:
+    """Returns a short sha256 hex digest of the repr of some values."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+
+def file_stat(filepath: PathType) -> dict[str, int]:
+    """Returns the modification time and size of a file."""
+    st = os.stat(filepath)
+    return dict(mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+
+def atomic_write_bytes(filepath: PathType, data: bytes) -> pathlib.Path:
+    """Writes data to filepath through a temporary file and an atomic rename."""
+    filepath = pathlib.Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(
+        dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, filepath)
+    except BaseException:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+        raise
+    return filepath
+
+
+def atomic_write_json(filepath: PathType, data: Any) -> pathlib.Path:
+    """Writes data as JSON to filepath atomically."""
+    return atomic_write_bytes(filepath, json.dumps(data, indent=2).encode())
+
+
+def read_json(filepath: PathType) -> Any | None:
+    """Returns JSON contents of filepath or None if missing or corrupt."""
+    try:
+        return json.loads(pathlib.Path(filepath).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def temporary_path(dirpath: PathType, suffix: str = "") -> pathlib.Path:
+    """Returns a unique, not yet existing, path inside dirpath."""
+    dirpath = pathlib.Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dirpath, prefix=".", suffix=suffix)
+    os.close(fd)
+    os.unlink(tmp)
+    return pathlib.Path(tmp)
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entries.
+
+    Args:
+        maxsize: maximum number of entries, None for unbounded.
+        maxbytes: maximum total sizeof of the values, None for unbounded.
+            The most recent entry is kept even if it alone exceeds it.
+        sizeof: returns the size of a value in bytes. Required by maxbytes.
+        on_evict: called with (key, value) of every evicted entry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 128,
+        maxbytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value of key, marking it as most recently used."""
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value) if self.sizeof and self.maxbytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.nbytes += size
+            while len(self._data) > 1 and (
+                (self.maxsize is not None and len(self._data) > self.maxsize)
+                or (self.maxbytes is not None and self.nbytes > self.maxbytes)
+            ):
+                self._evict()
+
+    def _evict(self) -> None:
+        key, (value, size) = self._data.popitem(last=False)
+        self.nbytes -= size
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def clear(self) -> None:
+        """Removes all entries and resets the stats."""
+        with self._lock:
+            while self._data:
+                self._evict()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int | None]:
+        """Returns hits, misses, evictions, size, maxsize, nbytes and maxbytes."""
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self),
+            maxsize=self.maxsize,
+            nbytes=self.nbytes,
+            maxbytes=self.maxbytes,
+        )
+
+
+component_caches: dict[str, LRUCache] = {}
+_missing = object()
+
+
+def component_nbytes(component) -> int:
+    """Returns approximate memory of the polygons and references of a hierarchy."""
+    cells = [component, *component.get_dependencies(recursive=True)]
+    points = sum(len(p.points) for c in cells for p in c.polygons)
+    return 16 * points + 256 * sum(len(c.references) for c in cells)
+
+
+def _remove_from_cell_cache(key: Hashable, component) -> None:
+    """Drops an evicted component from the gdsfactory cell cache too."""
+    name = getattr(component, "name", None)
+    if CACHE.get(name) is component:
+        del CACHE[name]
+
+
+def component_cache(
+    func: Callable | None = None,
+    maxsize: int | None = _missing,
+    maxbytes: int | None = _missing,
+) -> Callable:
+    """Memoizes a function returning Components in a bounded LRUCache.
+
+    Drop-in replacement of functools.cache, with cache_clear, cache_info and
+    __wrapped__. Evicted components are also removed from the gdsfactory cell
+    cache so they can be garbage collected.
+
+    Args:
+        func: function to memoize.
+        maxsize: maximum number of entries. Defaults to CONFIG.cache_maxsize.
+        maxbytes: polygon memory budget. Defaults to CONFIG.cache_maxbytes.
+    """
+    if func is None:
+        return functools.partial(component_cache, maxsize=maxsize, maxbytes=maxbytes)
+
+    lru = LRUCache(
+        maxsize=CONFIG.get("cache_maxsize", 128) if maxsize is _missing else maxsize,
+        maxbytes=CONFIG.get("cache_maxbytes") if maxbytes is _missing else maxbytes,
+        sizeof=component_nbytes,
+        on_evict=_remove_from_cell_cache,
+    )
+    component_caches[f"{func.__module__}.{func.__qualname__}"] = lru
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        value = lru.get(key, _missing)
+        if value is _missing:
+            value = func(*args, **kwargs)
+            lru[key] = value
+        return value
+
+    wrapper.cache = lru
+    wrapper.cache_clear = lru.clear
+    wrapper.cache_info = lru.stats
+    return wrapper
+
+
+def component_cache_stats() -> dict[str, dict[str, int | None]]:
+    """Returns stats of every component_cache, by function name."""
+    return {name: lru.stats() for name, lru in component_caches.items()}
+
+
+def clear_component_caches(cell_cache: bool = True) -> None:
+    """Clears every component_cache, and the gdsfactory cell cache."""
+    for lru in component_caches.values():
+        lru.clear()
+    if cell_cache:
+        CACHE.clear()
+
+
+if __name__ == "__main__":
+    from ubcpdk.config import PATH
+
+    print(file_hash(PATH.lyp_yaml))
+    print(file_stat(PATH.lyp_yaml))
@@ -1,6 +1,6 @@
 """Cells imported from the PDK."""
 
-from functools import cache, partial
+from functools import partial
 
 import gdsfactory as gf
 from gdsfactory import Component
@@ -18,6 +18,7 @@ from gdsfactory.typings import (
 )
 
 from ubcpdk import tech
+from ubcpdk.cache import component_cache
 from ubcpdk.config import CONFIG
 from ubcpdk.import_gds import import_gc, import_gds
 from ubcpdk.tech import (
@@ -625,13 +626,13 @@ def mmi1x2(**kwargs) -> gf.Component:
     return gf.components.mmi1x2(**kwargs)
 
 
-@cache
+@component_cache
 def dbr_cavity(dbr=dbr, coupler=coupler, **kwargs) -> gf.Component:
     dbr = dbr(**kwargs)
     return gf.components.cavity(component=dbr, coupler=coupler)
 
 
-@cache
+@component_cache
 def dbr_cavity_te(component="dbr_cavity", **kwargs) -> gf.Component:
     component = gf.get_component(component, **kwargs)
     return add_fiber_array(component=component)
@@ -773,7 +774,7 @@ add_pads_dc = partial(
 )
 
 
-@cache
+@component_cache
 def add_fiber_array_pads_rf(
     component: ComponentSpec = "ring_single_heater",
     username: str = CONFIG.username,
@@ -795,7 +796,7 @@ def add_fiber_array_pads_rf(
     return add_fiber_array(component=c1, **kwargs)
 
 
-@cache
+@component_cache
 def add_pads(
     component: ComponentSpec = "ring_single_heater",
     username: str = CONFIG.username,
@@ -1,6 +1,9 @@
 """Loads a default_config from this file.
 
 Can overwrite config with an optional `config.yml` file in the current working directory.
+
+Caches are stored in ``~/.cache/ubcpdk``, set ``UBCPDK_CACHE_DIR`` (or
+``cache_dir`` in ``config.yml``) to use another directory.
 """
 
 __all__ = ["PATH", "CONFIG"]
@@ -13,6 +16,11 @@ from omegaconf import OmegaConf
 default_config = io.StringIO(
     """
 username: JoaquinMatres
+import_gds_cache: true
+cache_maxsize: 128
+cache_maxbytes: null
+lazy: ${oc.decode:${oc.env:UBCPDK_LAZY,false}}
+cache_dir: ${oc.env:UBCPDK_CACHE_DIR,null}
 """
 )
 
@@ -22,12 +30,14 @@ cwd_config = cwd / "config.yml"
 config_base = OmegaConf.load(default_config)
 module = pathlib.Path(__file__).parent.absolute()
 repo = module.parent
+home = pathlib.Path.home()
 
 try:
     config_cwd = OmegaConf.load(cwd_config)
 except Exception:
     config_cwd = OmegaConf.create()
 CONFIG = OmegaConf.merge(config_base, config_cwd)
+cache_dir = pathlib.Path(CONFIG.cache_dir or home / ".cache" / "ubcpdk")
 
 
 class Path:
@@ -41,6 +51,10 @@ class Path:
     modes = repo / "modes"
     mask = module / "samples" / "build"
     lyp_yaml = module / "layers.yaml"
+    cache = cache_dir
+    import_gds_cache = cache / "import_gds"
+    measurement_store = cache / "measurements"
+    sparameters_cache = cache / "sparameters"
 
     mzi = data / "mzi"
     mzi1 = mzi / "ZiheGao_MZI1_272_Scan1.mat"
@@ -1,9 +1,27 @@
 """Data analysis module."""
 
 from .chop import chop
-from .find_bandwidth import find_bandwidth
-from .read_mat import read_mat
-from .remove_baseline import remove_baseline
-from .windowed_mean import windowed_mean
+from .find_bandwidth import find_bandwidth, find_bandwidths
+from .fit_mzi import fit_mzi, fit_mzi_batch
+from .read_mat import read_mat, read_mat_ports
+from .read_mat_batch import read_mat_batch
+from .remove_baseline import remove_baseline, remove_baseline_batch
+from .resonances import extract_resonances, extract_resonances_batch
+from .windowed_mean import windowed_mean, windowed_mean_stream
 
-__all__ = ["read_mat", "remove_baseline", "chop", "windowed_mean", "find_bandwidth"]
+__all__ = [
+    "read_mat",
+    "read_mat_ports",
+    "read_mat_batch",
+    "remove_baseline",
+    "remove_baseline_batch",
+    "chop",
+    "extract_resonances",
+    "extract_resonances_batch",
+    "fit_mzi",
+    "fit_mzi_batch",
+    "windowed_mean",
+    "windowed_mean_stream",
+    "find_bandwidth",
+    "find_bandwidths",
+]
@@ -1,19 +1,63 @@
-def chop(x, y, ymax=None, ymin=None, xmin=None, xmax=None):
-    """Chops x, y."""
-    if xmax:
-        y = y[x < xmax]
-        x = x[x < xmax]
+import numpy as np
 
-    if xmin:
-        y = y[x > xmin]
-        x = x[x > xmin]
 
-    if ymax:
-        x = x[y < ymax]
-        y = y[y < ymax]
+def chop_slice(x: np.ndarray, xmin=None, xmax=None) -> slice:
+    """Returns slice of a sorted x with xmin < x < xmax."""
+    start = None if xmin is None else int(np.searchsorted(x, xmin, side="right"))
+    stop = None if xmax is None else int(np.searchsorted(x, xmax, side="left"))
+    return slice(start, stop)
 
-    if ymin:
-        x = x[y > ymin]
-        y = y[y > ymin]
 
-    return x, y
+def chop(
+    x,
+    y,
+    ymax=None,
+    ymin=None,
+    xmin=None,
+    xmax=None,
+    axis: int = -1,
+    is_sorted: bool = False,
+):
+    """Chops x, y.
+
+    Keeps the points with xmin < x < xmax and ymin < y < ymax, building a single
+    combined mask. Limits set to None are ignored.
+
+    Args:
+        x: 1D array.
+        y: array with x along axis. 2D batches only support x limits.
+        ymax: max y.
+        ymin: min y.
+        xmin: min x.
+        xmax: max x.
+        axis: axis of y along x.
+        is_sorted: x is sorted, x limits then return views through searchsorted.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if y.ndim > 1 and (ymin is not None or ymax is not None):
+        raise ValueError("ymin and ymax need 1D y, one mask per trace is not a batch")
+
+    mask = None
+    if is_sorted:
+        index = [slice(None)] * y.ndim
+        index[axis] = chop_slice(x, xmin=xmin, xmax=xmax)
+        x = x[index[axis]]
+        y = y[tuple(index)]
+    elif xmin is not None or xmax is not None:
+        mask = np.ones(x.shape, dtype=bool)
+        if xmin is not None:
+            mask &= x > xmin
+        if xmax is not None:
+            mask &= x < xmax
+
+    if ymin is not None or ymax is not None:
+        mask = np.ones(x.shape, dtype=bool) if mask is None else mask
+        if ymin is not None:
+            mask &= y > ymin
+        if ymax is not None:
+            mask &= y < ymax
+
+    if mask is None:
+        return x, y
+    return x[mask], np.compress(mask, y, axis=axis)
@@ -1,22 +1,15 @@
 import pandas as pd
 from gdsfactory.typings import PathType
-from scipy.io import loadmat
 
+from ubcpdk.config import PATH
+from ubcpdk.data.read_mat import read_mat
 
-def convert_to_pandas(filename: PathType, port: int = 0) -> pd.DataFrame:
-    """Reads .mat file and parses it into a pandas DataFrame."""
-    data = loadmat(filename)
-
-    if "scanResults" in data:
-        wavelength = data["scanResults"][0][port][0][:, 0]
-        power = data["scanResults"][0][port][0][:, 1]
-    elif "scandata" in data:
-        wavelength = data["scandata"][0][0][0][:][0]
-        power = data["scandata"][0][0][1][:, port]
-    elif "wavelength" in data:
-        wavelength = data["wavelength"][0][:]
-        power = data["power"][:, port][:]
 
+def convert_to_pandas(
+    filename: PathType, port: int = 0, store: PathType | None = PATH.measurement_store
+) -> pd.DataFrame:
+    """Reads .mat file, or its copy in the measurement store, into a pandas DataFrame."""
+    wavelength, power = read_mat(filename, port=port, store=store)
     return pd.DataFrame({"wavelength": wavelength, "output_power": power})
 
 
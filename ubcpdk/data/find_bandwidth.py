@@ -23,6 +23,59 @@ def find_bandwidth(x: np.ndarray, y: np.ndarray, threshold: float = 3) -> float:
     return float(xr[ir] - xl[il])
 
 
+def find_bandwidths(
+    x: np.ndarray, y: np.ndarray, threshold: float = 3
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns bandwidth, center and peak of many traces in one vectorized pass.
+
+    The threshold crossings on each side of the peak are found by linear
+    interpolation between the two samples around them.
+    Traces that do not cross the threshold on both sides return nan.
+
+    Args:
+        x: wavelength, 1D shared by all traces or 2D with one row per trace.
+        y: power, 2D array with one trace per row.
+        threshold: default bandwidth point (in y scale units)
+            3 for dB, 0.5 if Y is in linear scale from 0 to 1.
+
+    Returns:
+        bandwidth: distance between the two crossings.
+        center: midpoint of the two crossings.
+        peak: max(y).
+    """
+    y = np.atleast_2d(y)
+    x = np.broadcast_to(x, y.shape)
+    rows = np.arange(y.shape[0])
+    n = y.shape[1]
+    j = np.arange(n)
+
+    index_max = np.argmax(y, axis=1)
+    peak = y[rows, index_max]
+    ybw = peak - threshold
+    below = y < ybw[:, None]
+
+    il = np.where(below & (j < index_max[:, None]), j, -1).max(axis=1)
+    ir = np.where(below & (j > index_max[:, None]), j, n).min(axis=1)
+    valid = (il >= 0) & (ir < n)
+
+    bandwidth = np.full(y.shape[0], np.nan)
+    center = np.full(y.shape[0], np.nan)
+    rows = rows[valid]
+    ybw = ybw[valid]
+
+    def crossing(i0, i1):
+        x0, x1 = x[rows, i0], x[rows, i1]
+        y0, y1 = y[rows, i0], y[rows, i1]
+        return x0 + (ybw - y0) * (x1 - x0) / (y1 - y0)
+
+    il, ir = il[valid], ir[valid]
+    xl = crossing(il, il + 1)
+    xr = crossing(ir - 1, ir)
+    bandwidth[valid] = xr - xl
+    center[valid] = (xl + xr) / 2
+    return bandwidth, center, peak
+
+
 def plot_bandwidth(x, y, threshold: float = 3) -> None:
     index_max = np.argmax(y)
     ymax = y[index_max]
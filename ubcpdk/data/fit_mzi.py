@@ -0,0 +1,212 @@
+"""Fit the analytic MZI model to measured spectra.
+
+Extracts ``n1``, ``n2`` and ``alpha`` of
+``ubcpdk.simulation.circuits.mzi_spectrum`` per device.
+The fit is warm-started from the group index given by an FFT estimate of the
+FSR and uses the analytic Jacobian of the model.
+"""
+
+import multiprocessing
+import pathlib
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from gdsfactory.typings import PathType
+from scipy.optimize import least_squares
+
+from ubcpdk.data.read_mat_batch import get_filenames
+from ubcpdk.data.remove_baseline import remove_baseline
+from ubcpdk.simulation.circuits.mzi_spectrum import (
+    mzi_spectrum,
+    mzi_spectrum_jacobian,
+)
+
+
+def estimate_fsr(wavelength: np.ndarray, power: np.ndarray, oversample: int = 8):
+    """Returns FSR of a periodic spectrum from the peak of its FFT.
+
+    Args:
+        wavelength: uniformly sampled wavelength.
+        power: linear power.
+        oversample: zero padding factor, for a finer frequency grid.
+    """
+    n = len(power) * oversample
+    spectrum = np.abs(np.fft.rfft(power - np.mean(power), n=n))
+    frequency = np.fft.rfftfreq(n, d=np.mean(np.diff(wavelength)))
+    spectrum[:oversample] = 0  # skip the residual baseline
+    return 1 / frequency[np.argmax(spectrum)]
+
+
+def fit_mzi(
+    wavelength_um: np.ndarray,
+    power: np.ndarray,
+    L1_um: float,
+    L2_um: float,
+    n1: float = 2.4,
+    alpha: float = 1e-3,
+    wavelength0_um: float = 1.55,
+) -> dict[str, float]:
+    """Returns n1, n2, alpha of mzi_spectrum fitted to a measured spectrum.
+
+    n2 is warm-started from the group index of the FFT estimated FSR,
+    n1 is refined around its initial value.
+
+    Args:
+        wavelength_um: wavelength in um.
+        power: linear power normalized to max 1.
+        L1_um: length of arm 1.
+        L2_um: length of arm 2.
+        n1: initial effective index at wavelength0_um.
+        alpha: initial propagation loss [micron^-1].
+        wavelength0_um: reference wavelength of the neff model.
+    """
+    w = np.asarray(wavelength_um)
+    fsr = estimate_fsr(w, power)
+    ng = wavelength0_um**2 / (fsr * abs(L2_um - L1_um))
+    n2 = (n1 - ng) / wavelength0_um
+
+    def residual(p):
+        n1, n2, alpha = p
+        return mzi_spectrum(L1_um, L2_um, w, alpha=alpha, n1=n1, n2=n2) - power
+
+    def jacobian(p):
+        n1, n2, alpha = p
+        jac = mzi_spectrum_jacobian(L1_um, L2_um, w, alpha=alpha, n1=n1, n2=n2)
+        return jac[[0, 1, 3]].T
+
+    r = least_squares(residual, x0=[n1, n2, alpha], jac=jacobian, method="lm")
+    n1, n2, alpha = r.x
+    return dict(
+        n1=n1,
+        n2=n2,
+        alpha=alpha,
+        ng=n1 - wavelength0_um * n2,
+        fsr_um=fsr,
+        cost=r.cost,
+    )
+
+
+def wavelength_to_um(wavelength: np.ndarray) -> np.ndarray:
+    """Returns wavelength in um, detecting m, um or nm from its magnitude.
+
+    Args:
+        wavelength: optical wavelength in m, um or nm.
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    median = np.median(wavelength)
+    if median < 1e-3:
+        return wavelength * 1e6
+    if median > 100:
+        return wavelength * 1e-3
+    return wavelength
+
+
+def normalize_spectrum(wavelength: np.ndarray, power: np.ndarray, deg: int = 4):
+    """Returns (wavelength_um, linear power) with baseline removed and max 1.
+
+    Samples with non finite power, such as -inf dB detector dropouts, are removed.
+
+    Args:
+        wavelength: wavelength in m, um or nm, as returned by read_mat.
+        power: power in dB.
+        deg: baseline polynomial degree.
+    """
+    wavelength = wavelength_to_um(np.ravel(wavelength))
+    power = np.ravel(power)
+    valid = np.isfinite(power)
+    wavelength, power = wavelength[valid], power[valid]
+    power = remove_baseline(wavelength, power, deg=deg)
+    power = 10 ** ((power - np.max(power)) / 10)
+    return wavelength, power
+
+
+def read_mzi_lengths(filepath: PathType) -> dict[str, float]:
+    """Returns deviceID to waveguide length difference (um) from a coordinates file."""
+    lengths = {}
+    for line in pathlib.Path(filepath).read_text().splitlines():
+        if line.startswith("%") or not line.strip():
+            continue
+        fields = [field.strip() for field in line.split(",")]
+        lengths[fields[5]] = float(fields[6])
+    return lengths
+
+
+def _fit_file(filename, port, L1_um, L2_um, kwargs) -> dict[str, float]:
+    from ubcpdk.data.read_mat import read_mat
+
+    wavelength, power = read_mat(filename, port=port)
+    wavelength_um, power = normalize_spectrum(wavelength, power)
+    return fit_mzi(wavelength_um, power, L1_um, L2_um, **kwargs)
+
+
+def fit_mzi_batch(
+    filenames: str | Mapping[str, PathType] | list[PathType],
+    lengths: Mapping[str, tuple[float, float]],
+    port: int = 0,
+    max_workers: int | None = None,
+    **kwargs,
+) -> tuple[pd.DataFrame, dict[str, Exception]]:
+    """Fits many MZI measurements concurrently in a process pool.
+
+    Returns DataFrame with one row per device and a dict of device name to
+    exception for failed devices.
+
+    Args:
+        filenames: glob pattern, list of files or dict of device name to file.
+        lengths: device name to (L1_um, L2_um).
+        port: detector port.
+        max_workers: number of worker processes. 1 fits serially in-process.
+
+    Keyword Args:
+        kwargs: passed to fit_mzi.
+    """
+    files = get_filenames(filenames)
+    results: dict[str, dict[str, float]] = {}
+    failures: dict[str, Exception] = {}
+
+    args = {
+        device: (filename, port, *lengths[device], kwargs)
+        for device, filename in files.items()
+        if device in lengths
+    }
+    for device in files.keys() - lengths.keys():
+        failures[device] = KeyError(f"No arm lengths for {device!r}")
+
+    if max_workers == 1:
+        for device, arg in args.items():
+            try:
+                results[device] = _fit_file(*arg)
+            except Exception as e:
+                failures[device] = e
+    else:
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as executor:
+            futures = {
+                device: executor.submit(_fit_file, *arg) for device, arg in args.items()
+            }
+            for device, future in futures.items():
+                try:
+                    results[device] = future.result()
+                except Exception as e:
+                    failures[device] = e
+
+    df = pd.DataFrame.from_dict(results, orient="index")
+    df.index.name = "device"
+    return df, failures
+
+
+if __name__ == "__main__":
+    from ubcpdk.config import PATH
+
+    dl = read_mzi_lengths(PATH.mzi / "EB486A_URChip3Coords.txt")
+    files = {
+        "_".join(f.stem.split("_")[:2]): f
+        for f in sorted(PATH.mzi.glob("*.mat"))
+        if "_".join(f.stem.split("_")[:2]) in dl
+    }
+    lengths = {device: (0, dl[device]) for device in files}
+    df, failures = fit_mzi_batch(files, lengths)
+    print(df)
+    print(failures)
@@ -1,31 +1,90 @@
+from collections.abc import Iterable
+
 import numpy as np
 from gdsfactory.typings import PathType, Tuple
 from scipy.io import loadmat
 
+from ubcpdk.config import PATH
+from ubcpdk.data.store import read_store
 
-def read_mat(filename: PathType, port: int = 0) -> Tuple[np.ndarray, np.ndarray]:
-    """Reads .mat file and returns 2 np.arrays (wavelength, power).
+variable_names = ("scanResults", "scandata", "wavelength", "power")
 
-    input: (.mat data download filename, port response)
-    outputs parsed data array [wavelength (m), power (dBm)]
-    data is assumed to be from automated measurement scanResults or scandata format
-    based on SiEPIC_Photonics_Package/core.py
-    """
-    data = loadmat(filename)
 
+def load_scan(filename: PathType) -> dict:
+    """Returns the scan variables of a .mat file, skipping every other variable."""
+    data = loadmat(filename, variable_names=variable_names)
+    if not any(name in data for name in ("scanResults", "scandata", "wavelength")):
+        raise ValueError(f"No scanResults, scandata or wavelength in {filename!r}")
+    return data
+
+
+def get_num_ports(data: dict) -> int:
+    """Returns the number of detector ports of the variables from load_scan."""
+    if "scanResults" in data:
+        return len(data["scanResults"][0])
+    elif "scandata" in data:
+        return data["scandata"][0][0][1].shape[1]
+    return data["power"].shape[1]
+
+
+def get_port(data: dict, port: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns [wavelength, power] of one port from the variables of load_scan."""
     if "scanResults" in data:
         wavelength = data["scanResults"][0][port][0][:, 0]
         power = data["scanResults"][0][port][0][:, 1]
     elif "scandata" in data:
         wavelength = data["scandata"][0][0][0][:][0]
         power = data["scandata"][0][0][1][:, port]
-    elif "wavelength" in data:
+    else:
         wavelength = data["wavelength"][0][:]
         power = data["power"][:, port][:]
 
     return [wavelength, power]
 
 
+def read_mat_ports(
+    filename: PathType, ports: Iterable[int] | None = None
+) -> dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """Reads several ports of a .mat file with a single load.
+
+    Args:
+        filename: .mat file.
+        ports: ports to return. Defaults to all ports.
+    """
+    data = load_scan(filename)
+    ports = range(get_num_ports(data)) if ports is None else ports
+    return {port: get_port(data, port) for port in ports}
+
+
+def read_mat(
+    filename: PathType, port: int = 0, store: PathType | None = PATH.measurement_store
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Reads .mat file and returns 2 np.arrays (wavelength, power).
+
+    input: (.mat data download filename, port response)
+    outputs parsed data array [wavelength (m), power (dBm)]
+    data is assumed to be from automated measurement scanResults or scandata format
+    based on SiEPIC_Photonics_Package/core.py
+
+    Only the scan variables are decoded. Use read_mat_ports to read several
+    ports with a single load.
+
+    When the measurement store holds an up-to-date copy of (filename, port)
+    it returns read-only memory-mapped views from the store instead.
+
+    Args:
+        filename: .mat file.
+        port: detector port.
+        store: measurement store directory (see ubcpdk.data.store). None skips it.
+    """
+    if store is not None:
+        stored = read_store(filename, port=port, dirpath=store)
+        if stored is not None:
+            return stored
+
+    return get_port(load_scan(filename), port=port)
+
+
 if __name__ == "__main__":
     import matplotlib.pyplot as plt
 
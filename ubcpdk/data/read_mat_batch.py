@@ -0,0 +1,105 @@
+import glob
+import multiprocessing
+import pathlib
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from gdsfactory.typings import PathType
+
+from ubcpdk.data.read_mat import read_mat_ports
+
+
+def _read_ports(filename: PathType, ports: tuple[int, ...]) -> dict[str, np.ndarray]:
+    """Returns long-format columns for some ports of one .mat file."""
+    wavelengths, powers, port_numbers = [], [], []
+    for port, (wavelength, power) in read_mat_ports(filename, ports=ports).items():
+        wavelength = np.ravel(wavelength)
+        wavelengths.append(wavelength)
+        powers.append(np.ravel(power))
+        port_numbers.append(np.full(wavelength.size, port))
+    return dict(
+        port=np.concatenate(port_numbers),
+        wavelength=np.concatenate(wavelengths),
+        power=np.concatenate(powers),
+    )
+
+
+def get_filenames(
+    filenames: str | PathType | Iterable[PathType] | Mapping[str, PathType],
+) -> dict[str, pathlib.Path]:
+    """Returns device name to filepath from a glob, a list or a dict of files.
+
+    Device names default to the file stem.
+    """
+    if isinstance(filenames, Mapping):
+        return {str(k): pathlib.Path(v) for k, v in filenames.items()}
+    if isinstance(filenames, str | pathlib.Path):
+        filenames = sorted(glob.glob(str(filenames)))
+    return {pathlib.Path(f).stem: pathlib.Path(f) for f in filenames}
+
+
+def read_mat_batch(
+    filenames: str | Iterable[PathType] | Mapping[str, PathType],
+    port: int | Iterable[int] = 0,
+    max_workers: int | None = None,
+) -> tuple[pd.DataFrame, dict[str, Exception]]:
+    """Reads many .mat files concurrently into one long-format DataFrame.
+
+    Returns a DataFrame with columns (device, port, wavelength, power) and a
+    dict of device name to the exception raised for every file that failed.
+    Failed files do not abort the batch.
+
+    Args:
+        filenames: glob pattern, list of files or dict of device name to file.
+        port: port or ports to read from each file.
+        max_workers: number of worker processes. 1 reads serially in-process.
+    """
+    files = get_filenames(filenames)
+    ports = (port,) if isinstance(port, int) else tuple(port)
+    results: dict[str, dict[str, np.ndarray]] = {}
+    failures: dict[str, Exception] = {}
+
+    if max_workers == 1:
+        for device, filename in files.items():
+            try:
+                results[device] = _read_ports(filename, ports)
+            except Exception as e:
+                failures[device] = e
+    else:
+        # fork is unsafe once JAX threads are running, as after an eager import
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as executor:
+            futures = {
+                device: executor.submit(_read_ports, filename, ports)
+                for device, filename in files.items()
+            }
+            for device, future in futures.items():
+                try:
+                    results[device] = future.result()
+                except Exception as e:
+                    failures[device] = e
+
+    devices = [device for device in files if device in results]
+    if not devices:
+        df = pd.DataFrame(columns=["device", "port", "wavelength", "power"])
+        return df, failures
+
+    columns = {
+        key: np.concatenate([results[device][key] for device in devices])
+        for key in ("port", "wavelength", "power")
+    }
+    device = np.repeat(devices, [results[d]["port"].size for d in devices])
+    df = pd.DataFrame(
+        dict(device=pd.Categorical(device, categories=devices), **columns)
+    )
+    return df, failures
+
+
+if __name__ == "__main__":
+    from ubcpdk.data.dbr import dbrs
+
+    df, failures = read_mat_batch(dbrs, port=1)
+    print(df.groupby("device", observed=True).power.max())
+    print(failures)
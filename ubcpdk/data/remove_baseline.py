@@ -16,6 +16,69 @@ def remove_baseline(wavelength: np.ndarray, power: np.ndarray, deg: int = 4):
     return power_corrected
 
 
+def baseline_basis(wavelength: np.ndarray, deg: int = 4) -> np.ndarray:
+    """Returns orthonormal basis (Q of the QR factorization) of the centered Vandermonde matrix.
+
+    The least squares baseline of any trace sampled on wavelength is its
+    projection ``Q @ (Q.T @ power)``, so the basis can be shared by every
+    trace on the same wavelength grid.
+
+    Args:
+        wavelength: 1D wavelength grid.
+        deg: polynomial degree.
+    """
+    x = wavelength - np.mean(wavelength)
+    x = x / np.max(np.abs(x))
+    q, _ = np.linalg.qr(np.vander(x, deg + 1))
+    return q
+
+
+def remove_baseline_batch(
+    wavelength: np.ndarray,
+    power: np.ndarray,
+    deg: int = 4,
+    n_iter: int = 0,
+    k: float = 1.0,
+    basis: np.ndarray | None = None,
+) -> np.ndarray:
+    """Return power corrected without baseline for many traces on one wavelength grid.
+
+    Same result as remove_baseline applied to every row of power, but the
+    Vandermonde matrix is factorized once and applied to the whole batch with
+    matrix products.
+
+    With n_iter > 0 the fit is reweighted iteratively: points more than k
+    standard deviations below the current baseline (resonance dips) are
+    ignored in the next fit.
+
+    Args:
+        wavelength: 1D wavelength grid shared by all traces.
+        power: 2D array with one trace per row.
+        deg: polynomial degree.
+        n_iter: number of reweighting iterations.
+        k: dip threshold in standard deviations of the residual.
+        basis: precomputed baseline_basis(wavelength, deg).
+    """
+    power = np.atleast_2d(power)
+    q = baseline_basis(wavelength, deg) if basis is None else basis
+    baseline = (power @ q) @ q.T
+
+    for _ in range(n_iter):
+        residual = power - baseline
+        sigma = np.std(residual, axis=1, keepdims=True)
+        w = (residual >= -k * sigma).astype(float)
+        a = np.einsum("mn,ni,nj->mij", w, q, q)
+        b = np.einsum("mn,ni->mi", w * power, q)
+        c = np.linalg.solve(a, b[..., None])[..., 0]
+        baseline = c @ q.T
+
+    power_corrected = power - baseline
+    power_corrected += np.max(baseline, axis=1, keepdims=True) - np.max(
+        power, axis=1, keepdims=True
+    )
+    return power_corrected
+
+
 if __name__ == "__main__":
     import matplotlib.pyplot as plt
 
@@ -0,0 +1,331 @@
+"""Resonance extraction for ring resonator measurements.
+
+Finds every resonance dip (through port) or peak (drop port) of a trace, fits
+all of them at once with a batched Levenberg-Marquardt Lorentzian fit and
+returns, per resonance, the wavelength, FWHM, loaded Q, extinction ratio, FSR,
+group index and fit quality. Poor fits and resonances with an unphysical FSR,
+such as noise dips, are rejected.
+"""
+
+import multiprocessing
+import re
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from gdsfactory.typings import PathType
+from scipy.signal import find_peaks
+
+from ubcpdk.data.read_mat_batch import get_filenames
+
+
+def find_resonances(
+    power: np.ndarray,
+    prominence: float = 3,
+    distance: int | None = None,
+    kind: str = "dip",
+) -> np.ndarray:
+    """Returns indices of the resonances of a trace.
+
+    Args:
+        power: power in dB.
+        prominence: minimum resonance depth or height in dB.
+        distance: minimum number of samples between resonances.
+        kind: dip for through ports, peak for drop ports.
+    """
+    if kind not in {"dip", "peak"}:
+        raise ValueError(f"kind={kind!r} not in ['dip', 'peak']")
+    power = np.asarray(power)
+    peaks, _ = find_peaks(
+        power if kind == "peak" else -power, prominence=prominence, distance=distance
+    )
+    return peaks
+
+
+def lorentzian_dip(x, a, b, x0, hwhm):
+    """Returns a - b / (1 + ((x - x0) / hwhm)**2)."""
+    return a - b / (1 + ((x - x0) / hwhm) ** 2)
+
+
+def fit_lorentzians(
+    x: np.ndarray,
+    y: np.ndarray,
+    weights: np.ndarray | None = None,
+    n_iter: int = 50,
+) -> np.ndarray:
+    """Fits one Lorentzian dip per row with a batched Levenberg-Marquardt.
+
+    Returns array of (a, b, x0, hwhm) per row, see lorentzian_dip.
+
+    Args:
+        x: 2D array, one window per row.
+        y: 2D array of linear power, one window per row.
+        weights: 2D array of weights, 0 to ignore samples.
+        n_iter: number of iterations.
+    """
+    weights = np.ones_like(y) if weights is None else weights
+    rows = np.arange(y.shape[0])
+
+    # normalize each window to improve conditioning
+    xc = x[:, x.shape[1] // 2][:, None]
+    xs = np.ptp(x, axis=1)[:, None]
+    ys = np.max(np.where(weights > 0, y, -np.inf), axis=1)[:, None]
+    u = (x - xc) / xs
+    v = y / ys
+
+    vmax = np.max(np.where(weights > 0, v, -np.inf), axis=1)
+    imin = np.argmin(np.where(weights > 0, v, np.inf), axis=1)
+    depth = vmax - v[rows, imin]
+    below_half = (v < (vmax - depth / 2)[:, None]) & (weights > 0)
+    du = np.max(np.abs(np.diff(u, axis=1)), axis=1)
+    hwhm = np.maximum(below_half.sum(axis=1), 1) * du / 2
+    p = np.stack([vmax, depth, u[rows, imin], hwhm], axis=1)
+
+    def residuals(p):
+        return v - lorentzian_dip(u, *(p[:, i, None] for i in range(4)))
+
+    lam = np.full(y.shape[0], 1e-3)
+    r = residuals(p)
+    cost = np.sum(weights * r**2, axis=1)
+
+    for _ in range(n_iter):
+        a, b, x0, g = (p[:, i, None] for i in range(4))
+        t = (u - x0) / g
+        lor = 1 / (1 + t**2)
+        jac = np.stack(
+            [
+                np.ones_like(u),
+                -lor,
+                -2 * b * t * lor**2 / g,
+                -2 * b * t**2 * lor**2 / g,
+            ],
+            axis=-1,
+        )
+        jtj = np.einsum("kn,kni,knj->kij", weights, jac, jac)
+        jtr = np.einsum("kn,kni,kn->ki", weights, jac, r)
+        damping = lam[:, None, None] * jtj * np.eye(4)
+        step = np.linalg.solve(jtj + damping + 1e-12 * np.eye(4), jtr[..., None])
+        p_new = p + step[..., 0]
+        p_new[:, 3] = np.abs(p_new[:, 3])
+        r_new = residuals(p_new)
+        cost_new = np.sum(weights * r_new**2, axis=1)
+
+        better = np.isfinite(cost_new) & (cost_new < cost)
+        p = np.where(better[:, None], p_new, p)
+        r = np.where(better[:, None], r_new, r)
+        cost = np.where(better, cost_new, cost)
+        lam = np.where(better, lam / 3, lam * 3)
+
+    a, b, x0, g = p.T
+    return np.stack(
+        [a * ys[:, 0], b * ys[:, 0], xc[:, 0] + x0 * xs[:, 0], g * xs[:, 0]], axis=1
+    )
+
+
+def _valid_fsr(
+    x0: np.ndarray,
+    length: float | None,
+    ng_range: tuple[float, float],
+    fsr_tolerance: float,
+) -> np.ndarray:
+    """Returns True for each valid FSR between consecutive resonances.
+
+    The FSR is checked against ng_range when the length is known and against
+    the median FSR otherwise.
+    """
+    fsr = np.diff(x0)
+    if fsr.size == 0:
+        return fsr > 0
+    if length:
+        ng = x0[:-1] ** 2 / (fsr * length)
+        return (ng >= ng_range[0]) & (ng <= ng_range[1])
+    return np.abs(fsr / np.median(fsr) - 1) <= fsr_tolerance
+
+
+def extract_resonances(
+    wavelength: np.ndarray,
+    power: np.ndarray,
+    length: float | None = None,
+    prominence: float = 3,
+    window: int = 50,
+    distance: int | None = None,
+    kind: str = "dip",
+    min_r2: float = 0.8,
+    ng_range: tuple[float, float] = (2.5, 6),
+    fsr_tolerance: float = 0.2,
+) -> pd.DataFrame:
+    """Returns one row per resonance of a trace.
+
+    Columns: wavelength, fwhm, q (loaded), extinction_ratio (dB),
+    fsr (to the next resonance), ng (nan if length is None) and r2 (coefficient
+    of determination of the Lorentzian fit).
+
+    Fits with r2 below min_r2 or a center outside their window are rejected.
+    So are resonances without a valid FSR to a neighbor, such as noise dips:
+    an FSR is valid when its ng is within ng_range if length is given, and
+    within fsr_tolerance of the median FSR otherwise. fsr and ng are nan when
+    the FSR to the next resonance is not valid, for example a missed one.
+
+    Args:
+        wavelength: 1D wavelength.
+        power: 1D power in dB.
+        length: ring round-trip length, in wavelength units.
+        prominence: minimum resonance depth or height in dB.
+        window: samples on each side of a resonance used for its fit.
+        distance: minimum number of samples between resonances.
+        kind: dip for through ports, peak for drop ports.
+        min_r2: minimum coefficient of determination of the fits.
+        ng_range: valid group index range, when length is given.
+        fsr_tolerance: maximum relative deviation from the median FSR, when
+            length is None.
+    """
+    wavelength = np.asarray(wavelength).ravel()
+    power = np.asarray(power).ravel()
+    columns = ["wavelength", "fwhm", "q", "extinction_ratio", "fsr", "ng", "r2"]
+    valid = np.isfinite(power)
+    wavelength, power = wavelength[valid], power[valid]
+    peaks = find_resonances(power, prominence=prominence, distance=distance, kind=kind)
+    if peaks.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    index = peaks[:, None] + np.arange(-window, window + 1)
+    weights = ((index >= 0) & (index < power.size)).astype(float)
+    index = np.clip(index, 0, power.size - 1)
+    x = wavelength[index]
+    y = 10 ** (power[index] / 10)
+    if kind == "peak":
+        # a peak a + b L is the dip (c - a) - b L of c - y
+        c = 2 * np.max(y, axis=1, keepdims=True)
+        y = c - y
+    params = fit_lorentzians(x, y, weights)
+
+    a, b, x0, hwhm = params.T
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        fit = lorentzian_dip(x, *(params[:, i, None] for i in range(4)))
+        mean = np.sum(weights * y, axis=1) / np.sum(weights, axis=1)
+        r2 = 1 - np.sum(weights * (y - fit) ** 2, axis=1) / np.sum(
+            weights * (y - mean[:, None]) ** 2, axis=1
+        )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "peak":
+            # the fitted baseline of a drop port can be at or below 0
+            baseline = np.maximum(c[:, 0] - a, np.min(c - y, axis=1))
+            extinction_ratio = 10 * np.log10((baseline + b) / baseline)
+        else:
+            extinction_ratio = 10 * np.log10(a / (a - b))
+
+    ok = (
+        np.isfinite(params).all(axis=1)
+        & (b > 0)
+        & (x0 >= x.min(axis=1))
+        & (x0 <= x.max(axis=1))
+        & (r2 >= min_r2)
+    )
+    keep = np.flatnonzero(ok)
+    if keep.size > 1:
+        # keep resonances with a valid FSR to their previous or next resonance
+        valid_fsr = _valid_fsr(x0[keep], length, ng_range, fsr_tolerance)
+        keep = keep[np.append(valid_fsr, False) | np.insert(valid_fsr, 0, False)]
+    x0, hwhm, extinction_ratio, r2 = (
+        x0[keep],
+        hwhm[keep],
+        extinction_ratio[keep],
+        r2[keep],
+    )
+
+    fwhm = 2 * hwhm
+    fsr = np.append(np.diff(x0), np.nan)[: x0.size]
+    fsr[:-1][~_valid_fsr(x0, length, ng_range, fsr_tolerance)] = np.nan
+    ng = x0**2 / (fsr * length) if length else np.full(x0.size, np.nan)
+    return pd.DataFrame(
+        dict(
+            wavelength=x0,
+            fwhm=fwhm,
+            q=x0 / fwhm,
+            extinction_ratio=extinction_ratio,
+            fsr=fsr,
+            ng=ng,
+            r2=r2,
+        ),
+        columns=columns,
+    )
+
+
+def ring_length(filename: PathType, unit: float = 1e-6) -> float | None:
+    """Returns round-trip length 2 pi R of ``RingDouble*R<radius>g<gap>`` files."""
+    match = re.search(r"R(\d+)g\d+", str(filename))
+    return 2 * np.pi * int(match.group(1)) * unit if match else None
+
+
+def _extract_file(filename, port, length, kwargs) -> pd.DataFrame:
+    from ubcpdk.data.read_mat import read_mat
+
+    wavelength, power = read_mat(filename, port=port)
+    return extract_resonances(wavelength, power, length=length, **kwargs)
+
+
+def extract_resonances_batch(
+    filenames: str | Mapping[str, PathType] | list[PathType],
+    lengths: Mapping[str, float] | None = None,
+    port: int = 1,
+    max_workers: int | None = None,
+    **kwargs,
+) -> tuple[pd.DataFrame, dict[str, Exception]]:
+    """Extracts resonances of many measurement files in a process pool.
+
+    Returns a DataFrame with a device column plus the extract_resonances
+    columns, and a dict of device name to exception for failed files.
+
+    Args:
+        filenames: glob pattern, list of files or dict of device name to file.
+        lengths: device name to ring round-trip length in m.
+            Defaults to ring_length(filename).
+        port: detector port. Port 1 is the through port of the RingDouble
+            measurements, use port 0 with kind="peak" for their drop port.
+        max_workers: number of worker processes. 1 extracts serially in-process.
+
+    Keyword Args:
+        kwargs: passed to extract_resonances, such as kind.
+    """
+    files = get_filenames(filenames)
+    lengths = lengths or {}
+    results: dict[str, pd.DataFrame] = {}
+    failures: dict[str, Exception] = {}
+
+    args = {
+        device: (filename, port, lengths.get(device, ring_length(filename)), kwargs)
+        for device, filename in files.items()
+    }
+
+    if max_workers == 1:
+        for device, arg in args.items():
+            try:
+                results[device] = _extract_file(*arg)
+            except Exception as e:
+                failures[device] = e
+    else:
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as executor:
+            futures = {
+                device: executor.submit(_extract_file, *arg)
+                for device, arg in args.items()
+            }
+            for device, future in futures.items():
+                try:
+                    results[device] = future.result()
+                except Exception as e:
+                    failures[device] = e
+
+    if not results:
+        return pd.DataFrame(), failures
+    df = pd.concat(results, names=["device", "resonance"]).reset_index()
+    return df, failures
+
+
+if __name__ == "__main__":
+    from ubcpdk.config import PATH
+
+    df, failures = extract_resonances_batch(str(PATH.ring / "*.mat"))
+    print(df.groupby("device")[["fsr", "ng", "q", "extinction_ratio"]].median())
+    print(failures)
@@ -0,0 +1,237 @@
+"""Columnar store for measurements.
+
+Measurements are converted once from .mat files into a directory with one
+``.npy`` file per column and an ``index.json`` with the column filenames and,
+for every (file, port), the row range and the device metadata parsed from the
+filename. Columns are memory-mapped, so reads are zero-copy views.
+
+Every write saves the columns under new filenames and then replaces the index,
+so readers always see columns that match their index.
+
+``read_mat`` and ``convert_to_pandas`` read from the default store in
+``PATH.measurement_store`` when it holds an up-to-date copy of the file.
+"""
+
+import os
+import pathlib
+import re
+import uuid
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+from gdsfactory.typings import PathType
+
+from ubcpdk.cache import atomic_write_json, file_stat, read_json, temporary_path
+from ubcpdk.config import PATH
+
+store_version = 2
+columns = ("wavelength", "power")
+
+
+def parse_filename(filename: PathType) -> dict[str, str | int]:
+    """Returns device metadata parsed from a measurement filename.
+
+    ``ELEC_413_lukasc_BraggSet1Num10_1272.mat`` returns
+    ``dict(author="lukasc", device="BraggSet1Num10", measurement_id=1272,
+    BraggSet=1, Num=10)``.
+    Trailing ``ScanN`` tokens are stored as ``scan``.
+    """
+    tokens = pathlib.Path(filename).stem.split("_")
+    metadata: dict[str, str | int] = {}
+
+    if tokens and re.fullmatch(r"Scan\d+", tokens[-1]):
+        metadata["scan"] = int(tokens.pop()[4:])
+    if tokens and tokens[-1].isdigit():
+        metadata["measurement_id"] = int(tokens.pop())
+    if tokens:
+        metadata["device"] = device = tokens.pop()
+        metadata.update({k: int(v) for k, v in re.findall(r"([A-Za-z]+)(\d+)", device)})
+    if tokens:
+        metadata["author"] = tokens.pop()
+    return metadata
+
+
+class MeasurementStore:
+    """Read-only view of a measurement store directory.
+
+    Args:
+        dirpath: store directory.
+    """
+
+    def __init__(self, dirpath: PathType = PATH.measurement_store) -> None:
+        self.dirpath = pathlib.Path(dirpath)
+        index = read_json(self.dirpath / "index.json")
+        if not index or index.get("version") != store_version:
+            raise FileNotFoundError(f"No measurement store in {str(self.dirpath)!r}")
+        self.entries: list[dict] = index["entries"]
+        self._keys = {
+            (entry["file"], entry["port"]): i for i, entry in enumerate(self.entries)
+        }
+        try:
+            self._columns = {
+                name: np.load(self.dirpath / filename, mmap_mode="r")
+                for name, filename in index["columns"].items()
+            }
+        except OSError as e:
+            raise FileNotFoundError(
+                f"No measurement store in {str(self.dirpath)!r}"
+            ) from e
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a memory-mapped column."""
+        return self._columns[name]
+
+    def get_entry(self, filename: PathType, port: int = 0) -> dict | None:
+        """Returns the index entry of (filename, port), or None if missing or stale.
+
+        Entries are stale when the source file still exists but its mtime or
+        size changed since it was stored.
+        """
+        key = (str(pathlib.Path(filename).resolve()), port)
+        if key not in self._keys:
+            return None
+        entry = self.entries[self._keys[key]]
+        try:
+            if file_stat(key[0]) != entry["stat"]:
+                return None
+        except OSError:
+            pass
+        return entry
+
+    def read(
+        self, filename: PathType, port: int = 0, columns: Iterable[str] = columns
+    ) -> list[np.ndarray] | None:
+        """Returns zero-copy views of some columns for (filename, port)."""
+        entry = self.get_entry(filename, port=port)
+        if entry is None:
+            return None
+        s = slice(entry["start"], entry["stop"])
+        return [self.column(name)[s] for name in columns]
+
+    def to_pandas(self, columns: Iterable[str] = columns) -> pd.DataFrame:
+        """Returns long-format DataFrame with device metadata and some columns."""
+        sizes = [entry["stop"] - entry["start"] for entry in self.entries]
+        metadata = pd.DataFrame(
+            [
+                dict(file=entry["file"], port=entry["port"], **entry["metadata"])
+                for entry in self.entries
+            ]
+        )
+        df = metadata.loc[np.repeat(np.arange(len(sizes)), sizes)]
+        df = df.reset_index(drop=True)
+        for name in columns:
+            df[name] = self.column(name)
+        return df
+
+
+_stores: dict[pathlib.Path, tuple[int, MeasurementStore]] = {}
+
+
+def get_store(dirpath: PathType = PATH.measurement_store) -> MeasurementStore | None:
+    """Returns the store in dirpath, reloaded when its index changes."""
+    dirpath = pathlib.Path(dirpath)
+    try:
+        mtime = os.stat(dirpath / "index.json").st_mtime_ns
+    except OSError:
+        return None
+    if dirpath not in _stores or _stores[dirpath][0] != mtime:
+        try:
+            _stores[dirpath] = (mtime, MeasurementStore(dirpath))
+        except FileNotFoundError:
+            return None
+    return _stores[dirpath][1]
+
+
+def read_store(
+    filename: PathType, port: int = 0, dirpath: PathType = PATH.measurement_store
+) -> list[np.ndarray] | None:
+    """Returns [wavelength, power] views from the store or None if not stored."""
+    store = get_store(dirpath)
+    return None if store is None else store.read(filename, port=port)
+
+
+def write_store(
+    filenames: str | Iterable[PathType] | Mapping[str, PathType],
+    port: int | Iterable[int] = 0,
+    dirpath: PathType = PATH.measurement_store,
+    append: bool = True,
+    max_workers: int | None = None,
+) -> MeasurementStore:
+    """Converts .mat files into a columnar measurement store.
+
+    Args:
+        filenames: glob pattern, list of files or dict of device name to file.
+        port: port or ports to store from each file.
+        dirpath: store directory.
+        append: keep entries already in the store that are not rewritten.
+        max_workers: number of worker processes for reading the .mat files.
+    """
+    from ubcpdk.data.read_mat_batch import get_filenames, read_mat_batch
+
+    dirpath = pathlib.Path(dirpath)
+    files = get_filenames(filenames)
+    df, failures = read_mat_batch(files, port=port, max_workers=max_workers)
+    if failures:
+        raise ValueError(f"Could not read {failures}")
+
+    entries = []
+    data: dict[str, list[np.ndarray]] = {name: [] for name in columns}
+    start = 0
+
+    for (device, p), d in df.groupby(["device", "port"], observed=True, sort=False):
+        filename = files[device]
+        entries.append(
+            dict(
+                file=str(filename.resolve()),
+                port=int(p),
+                stat=file_stat(filename),
+                start=start,
+                stop=start + len(d),
+                metadata=parse_filename(filename),
+            )
+        )
+        start += len(d)
+        for name in columns:
+            data[name].append(d[name].to_numpy())
+
+    old = get_store(dirpath) if append else None
+    if old is not None:
+        keys = {(entry["file"], entry["port"]) for entry in entries}
+        for entry in old.entries:
+            if (entry["file"], entry["port"]) in keys:
+                continue
+            s = slice(entry["start"], entry["stop"])
+            entries.append(entry | dict(start=start, stop=start + s.stop - s.start))
+            start += s.stop - s.start
+            for name in columns:
+                data[name].append(np.array(old.column(name)[s]))
+
+    version = uuid.uuid4().hex
+    filenames = {name: f"{name}.{version}.npy" for name in columns}
+    for name, filename in filenames.items():
+        tmp = temporary_path(dirpath, suffix=".npy")
+        np.save(tmp, np.concatenate(data[name]) if data[name] else np.empty(0))
+        os.replace(tmp, dirpath / filename)
+
+    previous = read_json(dirpath / "index.json") or {}
+    atomic_write_json(
+        dirpath / "index.json",
+        dict(version=store_version, columns=filenames, entries=entries),
+    )
+    _stores.pop(dirpath, None)
+
+    # keep the previous columns for readers that loaded the previous index
+    keep = set(filenames.values()) | set(previous.get("columns", {}).values())
+    for name in columns:
+        for filepath in dirpath.glob(f"{name}*.npy"):
+            if filepath.name not in keep:
+                filepath.unlink(missing_ok=True)
+    return MeasurementStore(dirpath)
+
+
+if __name__ == "__main__":
+    from ubcpdk.data.dbr import dbrs
+
+    store = write_store(dbrs, port=[0, 1])
+    print(store.to_pandas().groupby(["BraggSet", "Num"]).power.max())
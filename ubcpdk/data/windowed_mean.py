@@ -1,18 +1,93 @@
+from collections.abc import Iterable, Iterator
+
 import numpy as np
 import scipy.signal as sig
+from scipy.ndimage import uniform_filter1d
+
+
+def window_counts(size: int, n: int) -> np.ndarray:
+    """Returns number of points inside each window of a windowed mean.
 
+    Args:
+        size: number of points.
+        n: points per window side.
+    """
+    i = np.arange(size)
+    return np.minimum(i, n) + np.minimum(size - 1 - i, n) + 1
 
-def windowed_mean(data: np.array, n: int = 60) -> np.array:
+
+def windowed_mean(data: np.array, n: int = 60, axis: int | None = None) -> np.array:
     """Returns the smoothen data using a window averaging of a 1d array.
 
+    Windows are truncated at the edges and normalized by the number of points
+    they contain. 1D data, or data with an axis, is averaged with a running sum
+    along that axis (one trace per row for 2D batches), without temporaries.
+
     Args:
         data: data array.
         n: points per window.
+        axis: axis to average along. None averages over all dimensions.
+    """
+    data = np.asarray(data)
+    if axis is None and data.ndim > 1:
+        dims = len(data.shape)
+        s = sig.convolve(data, np.ones((2 * n + 1,) * dims), mode="same")
+        d = sig.convolve(np.ones_like(data), np.ones((2 * n + 1,) * dims), mode="same")
+        return s / d
+
+    axis = -1 if axis is None else axis
+    size = data.shape[axis]
+    s = uniform_filter1d(
+        data.astype(float, copy=False), size=2 * n + 1, axis=axis, mode="constant"
+    )
+    shape = [1] * data.ndim
+    shape[axis] = size
+    s *= ((2 * n + 1) / window_counts(size, n)).reshape(shape)
+    return s
+
+
+def windowed_mean_stream(
+    chunks: Iterable[np.ndarray], n: int = 60
+) -> Iterator[np.ndarray]:
+    """Yields windowed_mean of a long trace fed in chunks along the last axis.
+
+    Only the last 2n points of the trace are kept between chunks, so
+    multi-million-point sweeps never need to be in memory at once.
+    Concatenating the yielded chunks equals windowed_mean(trace, n, axis=-1).
+
+    Args:
+        chunks: consecutive pieces of the trace, split along the last axis.
+        n: points per window.
     """
-    dims = len(data.shape)
-    s = sig.convolve(data, np.ones((2 * n + 1,) * dims), mode="same")
-    d = sig.convolve(np.ones_like(data), np.ones((2 * n + 1,) * dims), mode="same")
-    return s / d
+    buffer = None  # samples from global index start
+    start = 0
+    emitted = 0
+
+    def mean(buffer, start, i0, i1, total):
+        """Returns windowed mean for global indices [i0, i1)."""
+        csum = np.cumsum(buffer, axis=-1, dtype=float)
+        csum = np.concatenate([np.zeros(csum.shape[:-1] + (1,)), csum], axis=-1)
+        i = np.arange(i0, i1)
+        lo = np.maximum(i - n, 0)
+        hi = np.minimum(i + n + 1, total)
+        s = csum[..., hi - start] - csum[..., lo - start]
+        return s / (hi - lo)
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        buffer = chunk if buffer is None else np.concatenate([buffer, chunk], axis=-1)
+        total = start + buffer.shape[-1]
+        stop = total - n
+        if stop > emitted:
+            yield mean(buffer, start, emitted, stop, total)
+            emitted = stop
+            drop = max(emitted - n - start, 0)
+            buffer = buffer[..., drop:]
+            start += drop
+
+    if buffer is not None and start + buffer.shape[-1] > emitted:
+        total = start + buffer.shape[-1]
+        yield mean(buffer, start, emitted, total, total)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,43 @@
-from functools import cache, partial
+import os
+import warnings
+from functools import partial
+from typing import NamedTuple
 
 import gdsfactory as gf
-from gdsfactory.component import Component
-from gdsfactory.typings import LayerSpec
-from numpy import arctan2, degrees, isclose, ndarray
-
-from ubcpdk.config import PATH
+from gdsfactory.component import Component, copy, copy_reference
+from gdsfactory.serialization import clean_value_json
+from gdsfactory.typings import Layer, LayerSpec
+from numpy import (
+    arctan2,
+    around,
+    array,
+    degrees,
+    empty,
+    full,
+    inf,
+    ndarray,
+    nextafter,
+    unique,
+    where,
+)
+from scipy.spatial import cKDTree
+
+import ubcpdk
+from ubcpdk.cache import (
+    atomic_write_json,
+    component_cache,
+    file_hash,
+    file_stat,
+    read_json,
+    temporary_path,
+    text_hash,
+)
+from ubcpdk.config import CONFIG, PATH
 from ubcpdk.tech import LAYER
 
 layer = LAYER.WG
 port_width = 0.5
+cache_version = 1
 
 
 def guess_port_orientaton(position: ndarray, name: str, label: str, n: int) -> int:
@@ -31,21 +59,261 @@ def guess_port_orientaton(position: ndarray, name: str, label: str, n: int) -> i
     return 180 if p[0] <= 0 else 0
 
 
-def remove_pins(component) -> Component:
-    """Remove pins."""
-    component.remove_layers(layers=(LAYER.DEVREC, LAYER.PORT, LAYER.PORTE))
-    component.paths = []
-    component._bb_valid = False
-    return component
+pin_layers = (LAYER.DEVREC, LAYER.PORT, LAYER.PORTE)
+
+
+def _copy_without_layers(
+    component: Component,
+    layers: set[tuple[int, int]],
+    parents: dict[int, Component],
+) -> Component:
+    """Returns copy of component without layers, or component if nothing changes.
+
+    Args:
+        component: to copy.
+        layers: polygons, paths and labels on these layers are not copied.
+        parents: id of referenced cell to the cell that replaces it.
+    """
+    cell = component._cell
+    cell_polygons, cell_paths, cell_labels = cell.polygons, cell.paths, cell.labels
+    polygons = [p for p in cell_polygons if (p.layer, p.datatype) not in layers]
+    paths = [p for p in cell_paths if layers.isdisjoint(zip(p.layers, p.datatypes))]
+    labels = [
+        label for label in cell_labels if (label.layer, label.texttype) not in layers
+    ]
+    references = component.references
+    new_parents = [parents.get(id(ref.parent), ref.parent) for ref in references]
+    if (
+        len(polygons) == len(cell_polygons)
+        and len(paths) == len(cell_paths)
+        and len(labels) == len(cell_labels)
+        and all(new is ref.parent for ref, new in zip(references, new_parents))
+    ):
+        return component
+
+    c = copy(
+        component,
+        references=[
+            copy_reference(ref, parent=parent)
+            for ref, parent in zip(references, new_parents)
+        ],
+        polygons=polygons,
+        paths=[path.copy() for path in paths],
+        labels=[],
+    )
+    # cell names are identities in a layout, so the copy gets a derived name
+    c.rename(f"{component.name}_no_pins", cache=False)
+    c._cell.add(*[label.copy() for label in labels])
+    return c
+
+
+def remove_pins(
+    component: Component, layers: tuple[LayerSpec, ...] = pin_layers
+) -> Component:
+    """Returns component without its own pins, references are kept.
+
+    The component is not modified. Returns a copy named ``{name}_no_pins``,
+    or the component itself when it has no pins.
+
+    Args:
+        component: to remove pins.
+        layers: pin and device recognition layers.
+    """
+    layers = {gf.get_layer(layer) for layer in layers}
+    return _copy_without_layers(component, layers, parents={})
+
+
+def remove_pins_recursive(
+    component: Component,
+    layers: tuple[LayerSpec, ...] = pin_layers,
+    memo: dict[int, tuple[Component, Component]] | None = None,
+) -> Component:
+    """Returns component without pins in any cell of its hierarchy.
+
+    No cell is modified. Each unique cell is visited once, however many times
+    it is referenced, and copied only when it or one of its subcells has pins.
+    The other cells are shared with the original hierarchy.
+
+    Args:
+        component: to remove pins.
+        layers: pin and device recognition layers.
+        memo: id of visited cell to (cell, result), to share across calls
+            with the same layers.
+    """
+    layers = {gf.get_layer(layer) for layer in layers}
+    memo = {} if memo is None else memo
+
+    # depth first, children before parents, without recursion
+    stack = [(component, False)]
+    while stack:
+        c, visited = stack.pop()
+        if id(c) in memo:
+            continue
+        children = {id(ref.parent): ref.parent for ref in c.references}
+        if visited:
+            parents = {key: memo[key][1] for key in children}
+            memo[id(c)] = (c, _copy_without_layers(c, layers, parents))
+        else:
+            stack.append((c, True))
+            stack.extend(
+                (child, False) for key, child in children.items() if key not in memo
+            )
+    return memo[id(component)][1]
+
+
+def get_label_index(
+    labels, snap_tolerance: float = 1e-3
+) -> dict[tuple[int, int], list[int]]:
+    """Returns spatial hash of label indices keyed by snapped grid cell.
+
+    Args:
+        labels: list of labels with origin.
+        snap_tolerance: grid cell size in um.
+    """
+    index: dict[tuple[int, int], list[int]] = {}
+    for i, label in enumerate(labels):
+        x, y = label.origin
+        key = (round(x / snap_tolerance), round(y / snap_tolerance))
+        index.setdefault(key, []).append(i)
+    return index
+
+
+def find_label_index(
+    index: dict[tuple[int, int], list[int]],
+    labels,
+    points,
+    snap_tolerance: float = 1e-3,
+    used: set[int] | None = None,
+) -> int | None:
+    """Returns index of the first unused label within snap_tolerance of any point.
+
+    Args:
+        index: spatial hash from get_label_index.
+        labels: list of labels used to build the index.
+        points: candidate (x, y) positions, in order of preference.
+        snap_tolerance: maximum distance in x and y in um.
+        used: indices of labels already assigned, updated in place.
+    """
+    used = used if used is not None else set()
+    for x, y in points:
+        kx, ky = round(x / snap_tolerance), round(y / snap_tolerance)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for i in index.get((kx + dx, ky + dy), ()):
+                    if i in used:
+                        continue
+                    lx, ly = labels[i].origin
+                    if abs(lx - x) <= snap_tolerance and abs(ly - y) <= snap_tolerance:
+                        used.add(i)
+                        return i
+    return None
+
+
+def find_label(
+    index: dict[tuple[int, int], list[int]],
+    labels,
+    points,
+    snap_tolerance: float = 1e-3,
+    used: set[int] | None = None,
+):
+    """Returns first unused label within snap_tolerance of any of the points.
+
+    Args:
+        index: spatial hash from get_label_index.
+        labels: list of labels used to build the index.
+        points: candidate (x, y) positions, in order of preference.
+        snap_tolerance: maximum distance in x and y in um.
+        used: indices of labels already assigned, updated in place.
+    """
+    i = find_label_index(index, labels, points, snap_tolerance, used)
+    return None if i is None else labels[i]
+
+
+def match_labels(labels, points: ndarray, snap_tolerance: float = 1e-3) -> ndarray:
+    """Returns the index of the label matched to each pin, -1 if none.
+
+    Candidate positions are queried in a k-d tree of the label origins, one
+    vectorized query per candidate for the pins still unmatched, and each pin
+    takes the nearest label of its first candidate with one. Pins that take a
+    label already taken by a previous pin fall back to find_label_index,
+    excluding the labels already taken.
 
+    Args:
+        labels: list of labels with origin.
+        points: (pins, candidates, 2) positions, candidates in order of preference.
+        snap_tolerance: maximum distance in x and y in um.
+    """
+    n = len(labels)
+    matches = full(len(points), -1)
+    if not n or not len(points):
+        return matches
+
+    tree = cKDTree(array([label.origin for label in labels]))
+    for candidate in range(points.shape[1]):
+        pending = where(matches < 0)[0]
+        if not len(pending):
+            break
+        _, nearest = tree.query(
+            points[pending, candidate],
+            p=inf,
+            distance_upper_bound=nextafter(snap_tolerance, inf),
+        )
+        found = nearest < n
+        matches[pending[found]] = nearest[found]
+
+    pins = where(matches >= 0)[0]
+    _, keep = unique(matches[pins], return_index=True)
+    used = set(matches[pins[keep]].tolist())
+    conflicts = set(pins.tolist()) - set(pins[keep].tolist())
+    if conflicts:
+        index = get_label_index(labels, snap_tolerance=snap_tolerance)
+        for pin in sorted(conflicts):
+            i = find_label_index(
+                index, labels, points[pin], snap_tolerance=snap_tolerance, used=used
+            )
+            matches[pin] = -1 if i is None else i
+    return matches
 
-def remove_pins_recursive(component):
-    component = remove_pins(component)
-    if component.references:
-        for ref in component.references:
-            rcell = ref.parent
-            ref.parent = remove_pins_recursive(rcell)
-    return component
+
+class SiepicPins(NamedTuple):
+    """Pin paths decoded into arrays, one row per pin."""
+
+    port_types: list[str]
+    centers: ndarray
+    p1: ndarray
+    p2: ndarray
+    orientations: ndarray
+    widths: ndarray
+
+
+def get_siepic_pins(component: Component, pin_layers: dict[str, Layer]) -> SiepicPins:
+    """Returns pin paths of a component decoded in one vectorized pass.
+
+    Args:
+        component: component with SiEPIC pin paths.
+        pin_layers: port_type to pin layer, in order of preference.
+    """
+    paths = []
+    port_types = []
+    for path in component.paths:
+        path_layers = set(zip(path.layers, path.datatypes))
+        for port_type, pin_layer in pin_layers.items():
+            if pin_layer in path_layers:
+                paths.append(path)
+                port_types.append(port_type)
+                break
+
+    if not paths:
+        points = empty((0, 2))
+        return SiepicPins(port_types, points, points, points, empty(0), empty(0))
+
+    ends = array([path.spine()[[0, -1]] for path in paths])
+    widths = array([path.widths()[0][0] for path in paths])
+    p1 = ends[:, 0]
+    p2 = ends[:, 1]
+    d = p2 - p1
+    orientations = around(degrees(arctan2(d[:, 1], d[:, 0])) % 360)
+    return SiepicPins(port_types, (p1 + p2) / 2, p1, p2, orientations, widths)
 
 
 def add_ports_from_siepic_pins(
@@ -54,10 +322,12 @@ def add_ports_from_siepic_pins(
     port_layer_optical: LayerSpec | None = None,
     pin_layer_electrical: LayerSpec = "PORTE",
     port_layer_electrical: LayerSpec | None = None,
+    snap_tolerance: float = 1e-3,
 ) -> Component:
     """Add ports from SiEPIC-type cells, where the pins are defined as paths.
 
-    Looks for label, path pairs.
+    Looks for label, path pairs. Pin paths are decoded in one vectorized pass
+    and matched to labels with vectorized k-d tree queries (see match_labels).
 
     Args:
         component: component.
@@ -65,6 +335,7 @@ def add_ports_from_siepic_pins(
         port_layer_optical: layer for optical ports.
         pin_layer_electrical: layer for electrical pins.
         port_layer_electrical: layer for electrical ports.
+        snap_tolerance: maximum label to pin distance in x and y (um).
     """
     pin_layers = {"optical": pin_layer_optical, "electrical": pin_layer_electrical}
 
@@ -77,57 +348,42 @@ def add_ports_from_siepic_pins(
 
     c = component
     labels = c.get_labels()
+    port_layers = {
+        "optical": port_layer_optical or pin_layers["optical"],
+        "electrical": port_layer_electrical or pin_layers["electrical"],
+    }
+    pins = get_siepic_pins(
+        c, {"optical": pin_layer_optical, "electrical": pin_layer_electrical}
+    )
+    matches = match_labels(
+        labels,
+        array([pins.centers, pins.p1, pins.p2]).transpose(1, 0, 2),
+        snap_tolerance=snap_tolerance,
+    )
+    port_names = set(c.ports)
 
-    for path in c.paths:
-        p1, p2 = path.spine()
-
-        path_layers = list(zip(path.layers, path.datatypes))
-
-        # Find the center of the path
-        center = (p1 + p2) / 2
-
-        # Find the label closest to the pin
-        label = None
-        for i, _label in enumerate(labels):
-            if (
-                all(isclose(_label.origin, center))
-                or all(isclose(_label.origin, p1))
-                or all(isclose(_label.origin, p2))
-            ):
-                label = _label
-                labels.pop(i)
-        if label is None:
+    for i, (port_type, center, p1, p2, angle, width) in enumerate(zip(*pins)):
+        if matches[i] < 0:
             print(
                 f"Warning: label not found for path: in center={center} p1={p1} p2={p2}"
             )
             continue
-        if pin_layer_optical in path_layers:
-            port_type = "optical"
-            port_layer = port_layer_optical or None
-        elif pin_layer_electrical in path_layers:
-            port_type = "electrical"
-            port_layer = port_layer_electrical or None
-        else:
-            continue
 
-        port_name = str(label.text)
+        port_name = str(labels[matches[i]].text)
 
-        # If the port name is already used, add a number to it
-        i = 1
-        while port_name in c.ports:
+        # If the port name is already used, add the pin number to it
+        while port_name in port_names:
             port_name += f"_{i}"
+        port_names.add(port_name)
 
-        angle = round(degrees(arctan2(p2[1] - p1[1], p2[0] - p1[0])) % 360)
-
-        port = gf.Port(
+        c.add_port(
             name=port_name,
             center=center,
-            width=path.widths()[0][0],
-            orientation=angle,
-            layer=port_layer or pin_layers[port_type],
+            width=width,
+            orientation=int(angle),
+            layer=port_layers[port_type],
             port_type=port_type,
         )
-        c.add_port(port)
     c.auto_rename_ports()
     return c
 
@@ -140,20 +396,138 @@ add_ports_from_siepic_pins = partial(
 )
 
 
-@cache
-def import_gds(gdspath, **kwargs):
-    c = gf.import_gds(
-        gdspath,
-        gdsdir=PATH.gds,
-        library="Design kits/ebeam",
-        model=gdspath.split(".")[0],
-        **kwargs,
+def get_ports_json(c: Component) -> list[dict]:
+    """Returns JSON serializable ports of a component."""
+    return [
+        dict(
+            name=port.name,
+            center=[float(x) for x in port.center],
+            width=float(port.width),
+            orientation=None if port.orientation is None else float(port.orientation),
+            layer=list(port.layer),
+            port_type=port.port_type,
+        )
+        for port in c.ports.values()
+    ]
+
+
+def add_ports_from_json(c: Component, ports: list[dict]) -> Component:
+    """Adds ports returned by get_ports_json to a component."""
+    for port in ports:
+        c.add_port(
+            name=port["name"],
+            center=port["center"],
+            width=port["width"],
+            orientation=port["orientation"],
+            layer=tuple(port["layer"]),
+            port_type=port["port_type"],
+        )
+    return c
+
+
+def _cache_paths(gdspath, kwargs, cache_dir):
+    """Returns (gdspath, metadata path) for a cached import.
+
+    The key includes the ubcpdk and gdsfactory versions, so entries written
+    by another release, with other pin recovery, are not reused.
+    """
+    version = (cache_version, ubcpdk.__version__, gf.config.__version__)
+    key = text_hash(str(gdspath), sorted(kwargs.items()), version)
+    stem = cache_dir / f"{os.path.basename(gdspath).split('.')[0]}_{key}"
+    return stem.with_suffix(".gds"), stem.with_suffix(".json")
+
+
+def _read_cached_import(gdspath, source, cache_dir, **kwargs) -> Component | None:
+    """Returns cached import or None if missing or stale.
+
+    The source GDS is rehashed only when its mtime or size changed.
+    """
+    cache_gdspath, cache_metapath = _cache_paths(gdspath, kwargs, cache_dir)
+    meta = read_json(cache_metapath)
+    if not meta or meta.get("version") != cache_version or not cache_gdspath.exists():
+        return None
+
+    if meta["stat"] != file_stat(source):
+        if meta["sha256"] != file_hash(source):
+            return None
+        meta["stat"] = file_stat(source)
+        atomic_write_json(cache_metapath, meta)
+
+    kwargs.pop("cellname", None)
+    c = gf.import_gds(cache_gdspath, cellname=meta["name"], **kwargs)
+    # gf.import_gds returns the cell of the gdsfactory cache if already imported
+    ports = [port for port in meta["ports"] if port["name"] not in c.ports]
+    add_ports_from_json(c, ports)
+    c.info.update(meta["info"])
+    return c
+
+
+def _write_cached_import(c: Component, gdspath, source, cache_dir, **kwargs) -> None:
+    """Stores an imported component with its ports and info.
+
+    The GDS is written first and the metadata last, so the metadata file
+    marks a complete entry for other processes.
+    """
+    cache_gdspath, cache_metapath = _cache_paths(gdspath, kwargs, cache_dir)
+    tmp = temporary_path(cache_dir, suffix=".gds")
+    try:
+        c.write_gds(gdspath=tmp)
+        os.replace(tmp, cache_gdspath)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    meta = dict(
+        version=cache_version,
+        source=str(source),
+        stat=file_stat(source),
+        sha256=file_hash(source),
+        name=c.name,
+        ports=get_ports_json(c),
+        info=clean_value_json(dict(c.info)),
     )
-    add_ports_from_siepic_pins(c)
+    atomic_write_json(cache_metapath, meta)
+
+
+def clear_import_gds_cache(cache_dir=PATH.import_gds_cache) -> None:
+    """Removes every on-disk import_gds cache entry."""
+    if cache_dir.exists():
+        for filepath in cache_dir.glob("*"):
+            filepath.unlink(missing_ok=True)
+    import_gds.cache_clear()
+
+
+@component_cache
+def import_gds(gdspath, **kwargs):
+    """Import SiEPIC GDS file and add ports from its pins.
+
+    Imports are stored in ``PATH.import_gds_cache`` (disable with
+    ``CONFIG.import_gds_cache = False``) together with their ports and info,
+    so new processes skip parsing the pins again.
+    """
+    kwargs = dict(library="Design kits/ebeam", model=gdspath.split(".")[0]) | kwargs
+    source = PATH.gds / gdspath
+    use_cache = CONFIG.get("import_gds_cache", False)
+    cache_dir = PATH.import_gds_cache
+
+    if use_cache:
+        c = _read_cached_import(gdspath, source, cache_dir, **kwargs)
+        if c is not None:
+            return c
+
+    c = gf.import_gds(gdspath, gdsdir=PATH.gds, **kwargs)
+    # gf.import_gds returns the cell of the gdsfactory cache if already imported
+    if not c.ports:
+        add_ports_from_siepic_pins(c)
+
+    if use_cache:
+        try:
+            _write_cached_import(c, gdspath, source, cache_dir, **kwargs)
+        except OSError as e:
+            warnings.warn(f"Could not cache {gdspath!r} import: {e}", stacklevel=2)
     return c
 
 
-@cache
+@component_cache
 def import_gc(gdspath, info=None, **kwargs):
     """Import grating coupler GDS file and add ports to it."""
     c = import_gds(gdspath, **kwargs)
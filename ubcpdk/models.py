@@ -1,19 +1,148 @@
 from __future__ import annotations
 
-from functools import partial
+import inspect
+from collections.abc import Callable
+from functools import cache, partial
 
 import gplugins.sax.models as sm
+import jax
+import jax.numpy as jnp
+import numpy as np
+from sax import SDict
+
+from ubcpdk.simulation.sparameters import get_index, load_sparameters
 
 nm = 1e-3
 
 
+################
+# FDTD S-parameters from PATH.sparameters
+################
+
+
+@cache
+def _sparameters_table(
+    name: str, port_map: tuple[tuple[str, str], ...], settings: tuple
+) -> tuple[tuple[str, ...], jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+    """Returns (port names, wavelengths, |S|, unwrapped phase of S).
+
+    S has shape (wavelengths, ports, ports), missing port pairs are 0.
+    """
+    index = get_index()
+    sp = load_sparameters(index.get(name, **dict(settings)), dirpath=index.dirpath)
+    pairs = [key.split(",") for key in sp if "," in key]
+    ports = sorted({port for pair in pairs for port in pair})
+
+    S = np.zeros((len(sp["wavelengths"]), len(ports), len(ports)), dtype=complex)
+    for p1, p2 in pairs:
+        S[:, ports.index(p1), ports.index(p2)] = sp[f"{p1},{p2}"]
+
+    renamed = dict(port_map)
+    port_names = tuple(renamed.get(p.split("@")[0], p.split("@")[0]) for p in ports)
+    return (
+        port_names,
+        jnp.asarray(sp["wavelengths"]),
+        jnp.asarray(np.abs(S)),
+        jnp.asarray(np.unwrap(np.angle(S), axis=0)),
+    )
+
+
+@jax.jit
+def _interpolate(wl, wavelengths, magnitude, phase):
+    """Returns S interpolated at wl, linearly in magnitude and phase."""
+    wl = jnp.asarray(wl)
+    i = jnp.clip(jnp.searchsorted(wavelengths, wl), 1, wavelengths.size - 1)
+    t = (wl - wavelengths[i - 1]) / (wavelengths[i] - wavelengths[i - 1])
+    t = jnp.clip(t, 0, 1)[..., None, None]
+    m = magnitude[i - 1] * (1 - t) + magnitude[i] * t
+    p = phase[i - 1] * (1 - t) + phase[i] * t
+    return m * jnp.exp(1j * p)
+
+
+def sparameters_model(
+    name: str,
+    port_map: dict[str, str] | None = None,
+    geometry: dict[str, float] | None = None,
+    **settings,
+) -> Callable[..., SDict]:
+    """Returns sax model interpolating the S-parameters of a component.
+
+    The data is loaded on the first call and kept in memory.
+
+    Args:
+        name: component name in ``PATH.sparameters``, such as ``ebeam_y_1550``.
+        port_map: simulation port name to component port name.
+        geometry: component settings of the simulated geometry, such as
+            dict(gap=0.2). The model takes them as keyword arguments, so sax
+            passes the instance settings, and raises ValueError when they differ.
+
+    Keyword Args:
+        settings: simulation settings to choose the file, such as
+            settings_hash="1f494ca0" or fiber_xoffset=0.
+    """
+    geometry = geometry or {}
+    key = (
+        name,
+        tuple(sorted((port_map or {}).items())),
+        tuple(sorted(settings.items())),
+    )
+
+    def model(wl: float = 1.55, **kwargs) -> SDict:
+        for k, value in kwargs.items():
+            if not np.isclose(value, geometry[k]):
+                raise ValueError(
+                    f"S-parameters of {name!r} were simulated for {k}={geometry[k]}, "
+                    f"got {k}={value}"
+                )
+        ports, wavelengths, magnitude, phase = _sparameters_table(*key)
+        S = _interpolate(wl, wavelengths, magnitude, phase)
+        return {
+            (p1, p2): S[..., i, j]
+            for i, p1 in enumerate(ports)
+            for j, p2 in enumerate(ports)
+        }
+
+    signature = inspect.signature(model)
+    model.__signature__ = signature.replace(
+        parameters=[
+            signature.parameters["wl"],
+            *[
+                inspect.Parameter(k, inspect.Parameter.KEYWORD_ONLY, default=v)
+                for k, v in geometry.items()
+            ],
+        ]
+    )
+    model.__name__ = name
+    model.__doc__ = f"Interpolated FDTD S-parameters of {name}."
+    return model
+
+
+# 2D simulations at resolution 30, or 20 where there is no other
+ebeam_y_1550 = sparameters_model("ebeam_y_1550", settings_hash="1f494ca0")
+ebeam_crossing4 = sparameters_model(
+    "ebeam_crossing4_7e264905", settings_hash="216d7d7a"
+)
+coupler_ring = sparameters_model(
+    "coupler_ring",
+    settings_hash="4778e15a",
+    geometry=dict(gap=0.2, radius=5.0, length_x=4.0),
+)
+
+
 straight = partial(sm.straight, wl0=1.55, neff=2.4, ng=4.2)
 bend_euler_sc = bend_euler = partial(sm.bend, loss=0.03)
 
 ################
 # grating couplers
 ################
-gc_te1550 = partial(sm.grating_coupler, loss=6, bandwidth=35 * nm, wl0=1.55)
+gc_te1550 = sparameters_model(
+    "ebeam_gc_te1550",
+    port_map=dict(vertical_te="o2"),
+    settings_hash="d14753ca",
+    fiber_angle_deg=-31,
+    fiber_xoffset=0,
+)
+gc_te1550_gaussian = partial(sm.grating_coupler, loss=6, bandwidth=35 * nm, wl0=1.55)
 gc_te1550_broadband = partial(sm.grating_coupler, loss=6, bandwidth=50 * nm, wl0=1.55)
 gc_tm1550 = partial(sm.grating_coupler, loss=6, bandwidth=35 * nm, wl0=1.55)
 gc_te1310_broadband = partial(sm.grating_coupler, loss=6, bandwidth=50 * nm, wl0=1.31)
@@ -24,11 +153,11 @@ gc_te1310 = partial(sm.grating_coupler, loss=6, bandwidth=35 * nm, wl0=1.31)
 ################
 mmi1x2 = partial(sm.mmi1x2, wl0=1.55, fwhm=0.2, loss_dB=0.3)
 mmi2x2 = partial(sm.mmi2x2, wl0=1.55, fwhm=0.2, loss_dB=0.3)
-ebeam_y_1550 = mmi1x2
 coupler = sm.coupler
 
 if __name__ == "__main__":
     import gplugins.sax as gs
 
     gs.plot_model(gc_te1550)
+    gs.plot_model(ebeam_y_1550)
     gs.plot_model(coupler)
@@ -0,0 +1,172 @@
+"""Opt-in profiler for the PDK cell factories.
+
+``CellProfiler`` wraps every factory of ``ubcpdk.cells``, and the
+``ubcpdk.components`` attributes pointing to them, while it is active.
+Every call records its wall time, whether gdsfactory returned a cached cell,
+the number of profiled factories it called and the references of the
+returned cell. Calls through functions bound at import time, such as the
+defaults of ``functools.partial`` factories, are not seen.
+
+    with CellProfiler() as profiler:
+        ubcpdk.components.ring_double_heater()
+    print(profiler.report())
+    profiler.write_chrome_trace("cells.json")  # open in chrome://tracing or Perfetto
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import pandas as pd
+from gdsfactory.cell import CACHE
+
+from ubcpdk.cache import atomic_write_json
+
+
+class CellProfiler:
+    """Records calls of the PDK cell factories.
+
+    Args:
+        cells: name to factory, wrapped in place. Defaults to ubcpdk.cells,
+            and the cells of the active PDK.
+        modules: modules whose factory attributes are wrapped too.
+    """
+
+    def __init__(
+        self,
+        cells: dict[str, Callable] | None = None,
+        modules: Iterable[str] = ("ubcpdk.components",),
+    ) -> None:
+        self._dicts = []
+        if cells is None:
+            import ubcpdk
+
+            pdk = ubcpdk.get_pdk()
+            cells = ubcpdk._get_cells()
+            if pdk.cells is not cells:
+                self._dicts.append(pdk.cells)
+        self.cells = cells
+        self._dicts.append(cells)
+        self.modules = [importlib.import_module(module) for module in modules]
+        self.events: list[dict[str, Any]] = []
+        self._patched: list[tuple[Any, str, Callable]] = []
+        self._stack: list[list[float]] = []  # [children, children time] per call
+        self._t0 = time.perf_counter_ns()
+
+    def wrap(self, name: str, factory: Callable) -> Callable:
+        """Returns factory that records its calls."""
+
+        @functools.wraps(factory)
+        def wrapper(*args, **kwargs):
+            cache_size = len(CACHE)
+            self._stack.append([0, 0])
+            start = time.perf_counter_ns()
+            try:
+                c = factory(*args, **kwargs)
+            finally:
+                duration = time.perf_counter_ns() - start
+                children, children_time = self._stack.pop()
+                if self._stack:
+                    self._stack[-1][0] += 1
+                    self._stack[-1][1] += duration
+
+            cell_name = getattr(c, "name", None)
+            self.events.append(
+                dict(
+                    factory=name,
+                    cell=cell_name,
+                    start_us=(start - self._t0) / 1e3,
+                    duration_us=duration / 1e3,
+                    self_us=(duration - children_time) / 1e3,
+                    depth=len(self._stack),
+                    cache_hit=len(CACHE) == cache_size and CACHE.get(cell_name) is c,
+                    children=children,
+                    references=len(getattr(c, "references", ())),
+                    tid=threading.get_ident(),
+                )
+            )
+            return c
+
+        return wrapper
+
+    def __enter__(self) -> CellProfiler:
+        for name, factory in list(self.cells.items()):
+            wrapper = self.wrap(name, factory)
+            for namespace in [*self._dicts, *self.modules]:
+                if isinstance(namespace, dict):
+                    if namespace.get(name) is factory:
+                        namespace[name] = wrapper
+                        self._patched.append((namespace, name, factory))
+                elif getattr(namespace, name, None) is factory:
+                    setattr(namespace, name, wrapper)
+                    self._patched.append((namespace, name, factory))
+        return self
+
+    def __exit__(self, *args) -> None:
+        for namespace, name, factory in reversed(self._patched):
+            if isinstance(namespace, dict):
+                namespace[name] = factory
+            else:
+                setattr(namespace, name, factory)
+        self._patched.clear()
+
+    def report(self) -> pd.DataFrame:
+        """Returns per factory calls, cache hits/misses, times in ms and fan-out."""
+        df = pd.DataFrame(self.events)
+        if df.empty:
+            return df
+        df["cache_miss"] = ~df["cache_hit"]
+        report = df.groupby("factory").agg(
+            calls=("cell", "size"),
+            cache_hits=("cache_hit", "sum"),
+            cache_misses=("cache_miss", "sum"),
+            total_ms=("duration_us", "sum"),
+            self_ms=("self_us", "sum"),
+            children=("children", "mean"),
+            references=("references", "mean"),
+        )
+        report[["total_ms", "self_ms"]] /= 1e3
+        return report.sort_values("self_ms", ascending=False)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Returns events in the Chrome trace event format."""
+        return dict(
+            traceEvents=[
+                dict(
+                    name=event["factory"],
+                    cat="cache_hit" if event["cache_hit"] else "cache_miss",
+                    ph="X",
+                    ts=event["start_us"],
+                    dur=event["duration_us"],
+                    pid=os.getpid(),
+                    tid=event["tid"],
+                    args=dict(
+                        cell=event["cell"],
+                        children=event["children"],
+                        references=event["references"],
+                    ),
+                )
+                for event in self.events
+            ],
+            displayTimeUnit="ms",
+        )
+
+    def write_chrome_trace(self, filepath) -> None:
+        """Writes the Chrome trace JSON, for chrome://tracing, Perfetto or speedscope."""
+        atomic_write_json(filepath, self.chrome_trace())
+
+
+if __name__ == "__main__":
+    import ubcpdk
+
+    with CellProfiler() as profiler:
+        ubcpdk.components.add_fiber_array(ubcpdk.components.ring_double_heater())
+        ubcpdk.components.dbr_cavity_te()
+    print(profiler.report())
+    profiler.write_chrome_trace("cells_trace.json")
@@ -1,27 +1,24 @@
 import jax.numpy as jnp
 import matplotlib.pyplot as plt
-import sax
 
 import ubcpdk
 from ubcpdk import PDK
+from ubcpdk.simulation.circuit_cache import get_circuit
 
 
 def test_mzi():
     c = ubcpdk.components.mzi(delta_length=20)
-    netlist = c.get_netlist()
-    models = PDK.models
-    circuit, _ = sax.circuit(netlist, models=models)  # type: ignore
+    circuit, _ = get_circuit(c, models=PDK.models)
     wl = jnp.linspace(1.5, 1.6)
 
     S = circuit(wl=wl)
     assert S
+    assert get_circuit(c, models=PDK.models)[0] is circuit
 
 
 if __name__ == "__main__":
     c = ubcpdk.components.mzi(delta_length=20)
-    netlist = c.get_netlist()
-    models = PDK.models
-    circuit, _ = sax.circuit(netlist, models=models)  # type: ignore
+    circuit, _ = get_circuit(c, models=PDK.models)
     wl = jnp.linspace(1.5, 1.6)
 
     S = circuit(wl=wl)
@@ -0,0 +1,105 @@
+"""Compiled sax circuits of PDK components, cached by netlist.
+
+``sax.circuit`` parses the netlist and builds the circuit function, and the
+first evaluation traces and compiles it with JAX. ``get_circuit`` does both
+once per (netlist, models) and keeps the jitted circuit in an LRU cache,
+so evaluating it again, for new wavelengths or parameters with the same shapes,
+only runs the compiled kernel.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+import gdsfactory as gf
+import jax
+import sax
+from gdsfactory.serialization import clean_value_json
+
+from ubcpdk.cache import LRUCache, text_hash
+
+circuits = LRUCache(maxsize=32)
+netlist_hashes = LRUCache(maxsize=1024)
+
+
+def netlist_hash(netlist: dict[str, Any]) -> str:
+    """Returns hash of the instances, connections and ports of a netlist."""
+    netlist = {k: v for k, v in netlist.items() if k not in {"name", "placements"}}
+    return text_hash(json.dumps(clean_value_json(netlist), sort_keys=True))
+
+
+def _models_key(models: dict[str, Callable]) -> tuple:
+    return tuple(sorted((name, id(model)) for name, model in models.items()))
+
+
+def get_circuit(
+    component: gf.Component | dict[str, Any],
+    models: dict[str, Callable] | None = None,
+    backend: str = "default",
+    jit: bool = True,
+) -> tuple[Callable[..., sax.SType], Any]:
+    """Returns (circuit, info) of sax.circuit, compiled once per netlist.
+
+    Args:
+        component: component or netlist. Netlists of locked components are
+            extracted once per component.
+        models: name to model. Defaults to the active PDK models.
+        backend: sax backend.
+        jit: jit compile the circuit.
+    """
+    models = gf.get_active_pdk().models if models is None else models
+
+    netlist = None
+    if isinstance(component, gf.Component):
+        # components are kept so their ids in the key are not reused
+        component_key = (component.name, id(component))
+        cached = netlist_hashes.get(component_key)
+        if cached is not None and component._locked:
+            key = cached[0]
+        else:
+            netlist = component.get_netlist()
+            key = netlist_hash(netlist)
+            if component._locked:
+                netlist_hashes[component_key] = (key, component)
+    else:
+        netlist = component
+        key = netlist_hash(netlist)
+
+    cache_key = (key, _models_key(models), backend, jit)
+    cached = circuits.get(cache_key)
+    if cached is not None:
+        return cached[:2]
+
+    if netlist is None:
+        netlist = component.get_netlist()
+    circuit, info = sax.circuit(netlist, models=models, backend=backend)
+    if jit:
+        circuit = jax.jit(circuit)
+    # models are kept so their ids in the key are not reused
+    circuits[cache_key] = (circuit, info, models)
+    return circuit, info
+
+
+def clear_circuit_cache() -> None:
+    """Removes all compiled circuits and netlist hashes."""
+    circuits.clear()
+    netlist_hashes.clear()
+
+
+if __name__ == "__main__":
+    import time
+
+    import jax.numpy as jnp
+
+    import ubcpdk
+
+    c = ubcpdk.components.mzi(delta_length=20)
+    wl = jnp.linspace(1.5, 1.6, 1001)
+    for _ in range(3):
+        t0 = time.perf_counter()
+        circuit, _ = get_circuit(c)
+        circuit(wl=wl)["o1", "o2"].block_until_ready()
+        print(f"{(time.perf_counter() - t0) * 1e3:10.2f} ms")
+    print(circuits.stats())
@@ -1,14 +1,20 @@
 from ubcpdk.simulation.circuits.mzi_spectrum import (
     mzi_spectrum,
+    mzi_spectrum_jacobian,
 )
 from ubcpdk.simulation.circuits.waveguide import (
     beta,
+    beta_gradient,
     neff,
+    neff_gradient,
 )
 
 __all__ = [
     "beta",
+    "beta_gradient",
     "mzi_spectrum",
+    "mzi_spectrum_jacobian",
     "neff",
+    "neff_gradient",
     "waveguide",
 ]
@@ -5,37 +5,97 @@ based on https://github.com/SiEPIC-Kits/SiEPIC_Photonics_Package
 
 import numpy as np
 
-from ubcpdk.simulation.circuits.waveguide import beta, neff, wavelength_um
+from ubcpdk.simulation.circuits import waveguide
+from ubcpdk.simulation.circuits.waveguide import (
+    beta,
+    beta_gradient,
+    get_wavelength_um,
+    neff,
+)
 
 
 def mzi_spectrum(
     L1_um,
     L2_um,
-    wavelength_um=wavelength_um,
+    wavelength_um=None,
     beta=beta,
     alpha=1e-3,
     neff=neff,
     n1=2.4,
     n2=-1,
     n3=0,
+    out=None,
 ):
     """Returns MZI spectrum.
 
+    With the default beta model the spectrum is evaluated in real arithmetic,
+    0.25 * (exp(-alpha L1) + exp(-alpha L2) + 2 exp(-alpha (L1 + L2) / 2) cos(phi)),
+    without intermediate complex arrays.
+
     Args:
         L1_um.
         L2_um.
-        wavelength_um.
+        wavelength_um: defaults to get_wavelength_um().
         beta: propagation constant.
+        alpha: propagation loss [micron^-1] constant.
+        neff: effective index array or function.
+        n1, n2, n3: neff polynomial coefficients.
+        out: optional float array to store the result in.
     """
+    w = get_wavelength_um() if wavelength_um is None else wavelength_um
+
+    if beta is waveguide.beta:
+        if callable(neff):
+            neff = neff(w, n1=n1, n2=n2, n3=n3)
+        out = np.empty(np.shape(w)) if out is None else out
+        # phase difference between the arms
+        out = np.multiply(neff, 2 * np.pi * (L2_um - L1_um), out=out)
+        out /= w
+        np.cos(out, out=out)
+        out *= 0.5 * np.exp(-alpha * (L1_um + L2_um) / 2)
+        out += 0.25 * (np.exp(-alpha * L1_um) + np.exp(-alpha * L2_um))
+        return out
+
     if callable(beta):
-        beta = beta(wavelength_um, neff=neff, alpha=alpha, n1=n1, n2=n2, n3=n3)
+        beta = beta(w, neff=neff, alpha=alpha, n1=n1, n2=n2, n3=n3)
+
+    field = np.exp(-1j * beta * L1_um) + np.exp(-1j * beta * L2_um)
+    return np.multiply(np.abs(field) ** 2, 0.25, out=out)
+
+
+def mzi_spectrum_jacobian(
+    L1_um,
+    L2_um,
+    wavelength_um=None,
+    alpha=1e-3,
+    n1=2.4,
+    n2=-1,
+    n3=0,
+):
+    """Returns d mzi_spectrum / d (n1, n2, n3, alpha) with shape (4, wavelength points).
+
+    Uses the analytic gradient of beta, so no finite differences are needed.
 
-    return 0.25 * np.abs(np.exp(-1j * beta * L1_um) + np.exp(-1j * beta * L2_um)) ** 2
+    Args:
+        L1_um.
+        L2_um.
+        wavelength_um.
+        alpha: propagation loss [micron^-1] constant.
+        n1, n2, n3: neff polynomial coefficients.
+    """
+    wavelength_um = get_wavelength_um() if wavelength_um is None else wavelength_um
+    b = beta(wavelength_um, neff=neff, alpha=alpha, n1=n1, n2=n2, n3=n3)
+    e1 = np.exp(-1j * b * L1_um)
+    e2 = np.exp(-1j * b * L2_um)
+    field = e1 + e2
+    dfield = -1j * (L1_um * e1 + L2_um * e2) * beta_gradient(wavelength_um)
+    return 0.5 * np.real(np.conj(field) * dfield)
 
 
 if __name__ == "__main__":
     import matplotlib.pyplot as plt
 
+    wavelength_um = get_wavelength_um()
     # plt.plot(wavelength_um, mzi_spectrum(100, 110))
     plt.plot(wavelength_um, 10 * np.log10(mzi_spectrum(L1_um=40, L2_um=255)))
     plt.show()
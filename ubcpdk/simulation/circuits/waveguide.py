@@ -3,45 +3,101 @@
 based on https://github.com/SiEPIC-Kits/SiEPIC_Photonics_Package
 """
 
+from functools import cache
+
 import numpy as np
 
 wavelength_start = 1500e-9
 wavelength_stop = 1600e-9
 resolution = 0.001
-wavelength_um = (
-    np.linspace(
-        wavelength_start,
-        wavelength_stop,
-        round((wavelength_stop - wavelength_start) * 1e9 / resolution),
+
+
+@cache
+def get_wavelength_um(
+    wavelength_start: float = wavelength_start,
+    wavelength_stop: float = wavelength_stop,
+    resolution: float = resolution,
+) -> np.ndarray:
+    """Returns read-only wavelength grid in um, built once per arguments.
+
+    Args:
+        wavelength_start: in m.
+        wavelength_stop: in m.
+        resolution: in nm.
+    """
+    w = (
+        np.linspace(
+            wavelength_start,
+            wavelength_stop,
+            round((wavelength_stop - wavelength_start) * 1e9 / resolution),
+        )
+        * 1e6
     )
-    * 1e6
-)
+    w.flags.writeable = False
+    return w
+
+
+def __getattr__(name: str):
+    if name == "wavelength_um":
+        return get_wavelength_um()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def neff(wavelength_um=wavelength_um, n1=2.4, n2=-1.0, n3=0.0, wavelength0_um=1.55):
-    """Waveguide model neff."""
-    w = wavelength_um
-    w0 = wavelength0_um
-    return n1 + n2 * (w - w0) + n3 * (w - w0) ** 2
+def neff(wavelength_um=None, n1=2.4, n2=-1.0, n3=0.0, wavelength0_um=1.55, out=None):
+    """Waveguide model neff.
 
+    Args:
+        wavelength_um: in um. Defaults to get_wavelength_um().
+        n1, n2, n3: polynomial coefficients around wavelength0_um.
+        wavelength0_um: reference wavelength.
+        out: optional float array to store the result in.
+    """
+    w = get_wavelength_um() if wavelength_um is None else wavelength_um
+    d = np.subtract(w, wavelength0_um)
+    out = np.multiply(d, n3, out=out)
+    out += n2
+    out *= d
+    out += n1
+    return out
+
+
+def neff_gradient(wavelength_um=None, wavelength0_um=1.55):
+    """Returns d neff / d (n1, n2, n3) with shape (3, wavelength points)."""
+    w = get_wavelength_um() if wavelength_um is None else wavelength_um
+    d = np.asarray(w) - wavelength0_um
+    return np.stack([np.ones_like(d), d, d**2])
 
-def beta(wavelength_um=wavelength_um, alpha=1e-3, neff=neff, n1=2.4, n2=-1, n3=0):
+
+def beta(wavelength_um=None, alpha=1e-3, neff=neff, n1=2.4, n2=-1, n3=0, out=None):
     """Propagation constant.
 
     Args:
-        wavelength_um: in um.
+        wavelength_um: in um. Defaults to get_wavelength_um().
         alpha: propagation loss [micron^-1] constant.
+        neff: effective index array or function.
+        n1, n2, n3: neff polynomial coefficients.
+        out: optional complex array to store the result in.
     """
+    w = get_wavelength_um() if wavelength_um is None else wavelength_um
     if callable(neff):
-        neff = neff(wavelength_um, n1=n1, n2=n2, n3=n3)
+        neff = neff(w, n1=n1, n2=n2, n3=n3)
 
-    return 2 * np.pi * neff / wavelength_um - 1j * alpha / 2 * np.ones(
-        np.size(wavelength_um)
-    )
+    out = np.divide(neff, w, out=out, dtype=complex)
+    out *= 2 * np.pi
+    out -= 0.5j * alpha
+    return out
+
+
+def beta_gradient(wavelength_um=None, wavelength0_um=1.55):
+    """Returns d beta / d (n1, n2, n3, alpha) with shape (4, wavelength points)."""
+    w = np.asarray(get_wavelength_um() if wavelength_um is None else wavelength_um)
+    dn = 2 * np.pi * neff_gradient(w, wavelength0_um=wavelength0_um) / w
+    return np.concatenate([dn, np.full((1, w.size), -0.5j)]).astype(complex)
 
 
 if __name__ == "__main__":
     import matplotlib.pyplot as plt
 
+    wavelength_um = get_wavelength_um()
     plt.plot(wavelength_um, neff(wavelength_um))
     plt.show()
@@ -0,0 +1,348 @@
+"""Monte-Carlo variability of PDK circuits.
+
+Samples waveguide width and thickness, propagation loss and splitter imbalance
+around the ``TECH`` and ``LAYER_STACK`` values, and maps them to neff, group
+index, coupling and loss with a linear sensitivity model.
+The neff width sensitivity comes from the mode solver sweep in
+``find_neff_vs_width.csv``, the other sensitivities are documented defaults
+of get_waveguide_model. The circuit geometry comes from the ``mzi``,
+``ring_single`` and ``ring_double`` cells, see get_geometry.
+
+Figures of merit use closed forms of the ``mzi``, ``ring_single`` and
+``ring_double`` transfer functions, so every sample is a few elementwise
+operations. They are evaluated with jitted JAX on the whole batch, or with
+NumPy across a process pool when JAX is not available.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import warnings
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ubcpdk.config import PATH
+from ubcpdk.tech import LAYER_STACK, TECH
+
+wavelength0 = 1.55
+neff_vs_width_csv = PATH.module / "simulation" / "find_neff_vs_width.csv"
+variation_names = ("dwidth", "dthickness", "loss_scale", "split1", "split2")
+
+
+def get_waveguide_model(
+    wg_width: float = TECH.wg_width,
+    thickness: float = LAYER_STACK.layers["core"].thickness,
+    ng: float = 4.2,
+    dneff_dthickness: float = 2.9,
+    dng_dwidth: float = -2.0,
+    dng_dthickness: float = -1.0,
+    loss_dB_cm: float = 3.0,
+    coupling: float = 0.1,
+    coupling_decay: float = 0.1,
+    wavelength: float = wavelength0,
+) -> dict[str, float]:
+    """Returns nominal values and sensitivities of the strip waveguide.
+
+    neff and dneff/dwidth are interpolated from the fundamental mode of
+    find_neff_vs_width.csv. That sweep only varies the width at one
+    wavelength and thickness, so ng, the thickness sensitivities, dng/dwidth
+    and the coupling are not derived here. Their defaults are assumed values
+    for a 500 x 220 nm strip waveguide at 1550 nm, replace them with
+    simulated or measured ones, such as ng from ubcpdk.data.fit_mzi.
+
+    Args:
+        wg_width: nominal waveguide width in um.
+        thickness: nominal silicon thickness in um.
+        ng: nominal group index (assumed).
+        dneff_dthickness: neff change per um of thickness (assumed). Thinner
+            silicon pushes the TE mode into the cladding, so it is positive
+            and larger than dneff/dwidth (2.0 /um at 0.5 um in the CSV).
+        dng_dwidth: group index change per um of width (assumed). Negative,
+            as the mode is less dispersive in wider waveguides.
+        dng_dthickness: group index change per um of thickness (assumed),
+            negative for the same reason.
+        loss_dB_cm: nominal propagation loss.
+        coupling: power coupling of the ring couplers at their nominal gap
+            (assumed).
+        coupling_decay: gap change in um that scales the coupling by e
+            (assumed). The coupling decays exponentially with the gap, and
+            wider waveguides narrow the gap by the width change.
+        wavelength: in um.
+    """
+    table = np.loadtxt(neff_vs_width_csv, delimiter=",", skiprows=1)
+    neff, width = table[:, 0], table[:, -1]
+    return dict(
+        neff=float(np.interp(wg_width, width, neff)),
+        dneff_dwidth=float(np.interp(wg_width, width, np.gradient(neff, width))),
+        dneff_dthickness=dneff_dthickness,
+        ng=ng,
+        dng_dwidth=dng_dwidth,
+        dng_dthickness=dng_dthickness,
+        thickness=thickness,
+        alpha=loss_dB_cm / (10 * np.log10(np.e)) * 1e-4,
+        coupling=coupling,
+        coupling_decay=coupling_decay,
+        wavelength=wavelength,
+    )
+
+
+def sample_variations(
+    n: int,
+    seed: int | None = 0,
+    sigma_width: float = 0.01,
+    sigma_thickness: float = 0.005,
+    sigma_loss: float = 0.2,
+    sigma_split: float = 0.02,
+) -> dict[str, np.ndarray]:
+    """Returns n random process samples.
+
+    Args:
+        n: number of samples.
+        seed: random seed.
+        sigma_width: standard deviation of the width in um.
+        sigma_thickness: standard deviation of the thickness in um.
+        sigma_loss: relative standard deviation of the propagation loss.
+        sigma_split: standard deviation of the splitter power ratio.
+    """
+    rng = np.random.default_rng(seed)
+    return dict(
+        dwidth=rng.normal(0, sigma_width, n),
+        dthickness=rng.normal(0, sigma_thickness, n),
+        loss_scale=rng.lognormal(0, sigma_loss, n),
+        split1=0.5 + rng.normal(0, sigma_split, n),
+        split2=0.5 + rng.normal(0, sigma_split, n),
+    )
+
+
+def _waveguide(xp, samples, model) -> dict[str, Any]:
+    """Returns per sample group index, power loss alpha and wavelength shift."""
+    dw, dt = samples["dwidth"], samples["dthickness"]
+    dneff = model["dneff_dwidth"] * dw + model["dneff_dthickness"] * dt
+    ng = model["ng"] + model["dng_dwidth"] * dw + model["dng_dthickness"] * dt
+    return dict(
+        ng=ng,
+        alpha=model["alpha"] * samples["loss_scale"],
+        wavelength_shift_nm=1e3 * model["wavelength"] * dneff / ng,
+    )
+
+
+def _coupling(xp, samples, model):
+    """Returns power coupling, wider waveguides narrow the gap."""
+    k = model["coupling"] * xp.exp(samples["dwidth"] / model["coupling_decay"])
+    return xp.clip(k, 0, 1)
+
+
+def get_geometry(circuit: str, **settings) -> dict[str, float]:
+    """Returns the geometry of the figures of merit of a ubcpdk.components cell.
+
+    Ring radius and straight lengths are the cell settings. The mzi short arm
+    length is half the route length of both arms minus delta_length, so it
+    includes the bends and straights the cell places.
+
+    Args:
+        circuit: mzi, ring_single or ring_double.
+
+    Keyword Args:
+        settings: cell settings, such as delta_length or radius.
+    """
+    from ubcpdk import components
+
+    c = getattr(components, circuit)(**settings)
+    if circuit == "mzi":
+        arms = sum(ref.parent.info.get("route_info_length", 0) for ref in c.references)
+        delta_length = c.settings.delta_length
+        return dict(delta_length=delta_length, length=(arms - delta_length) / 2)
+    return {k: getattr(c.settings, k) for k in ("radius", "length_x", "length_y")}
+
+
+def mzi_figures(
+    xp, samples, model, delta_length: float, length: float
+) -> dict[str, Any]:
+    """Returns FSR, extinction ratio, insertion loss and wavelength shift of mzi.
+
+    Args:
+        xp: numpy or jax.numpy.
+        samples: from sample_variations.
+        model: from get_waveguide_model.
+        delta_length: arm length difference in um.
+        length: short arm length in um.
+    """
+    wg = _waveguide(xp, samples, model)
+    s1, s2 = samples["split1"], samples["split2"]
+    a = xp.sqrt(s1 * s2) * xp.exp(-wg["alpha"] * length / 2)
+    b = xp.sqrt((1 - s1) * (1 - s2)) * xp.exp(
+        -wg["alpha"] * (length + delta_length) / 2
+    )
+    return dict(
+        fsr_nm=1e3 * model["wavelength"] ** 2 / (wg["ng"] * delta_length),
+        extinction_ratio=20 * xp.log10((a + b) / xp.abs(a - b)),
+        insertion_loss=-20 * xp.log10(a + b),
+        wavelength_shift_nm=wg["wavelength_shift_nm"],
+    )
+
+
+def ring_single_figures(
+    xp, samples, model, radius: float, length_x: float, length_y: float
+) -> dict[str, Any]:
+    """Returns FSR, extinction ratio, loaded Q and resonance shift of ring_single.
+
+    Args:
+        xp: numpy or jax.numpy.
+        samples: from sample_variations.
+        model: from get_waveguide_model.
+        radius: in um.
+        length_x: coupler straight length in um.
+        length_y: vertical straight length in um.
+    """
+    wg = _waveguide(xp, samples, model)
+    L = 2 * np.pi * radius + 2 * length_x + 2 * length_y
+    r = xp.sqrt(1 - _coupling(xp, samples, model))
+    a = xp.exp(-wg["alpha"] * L / 2)
+    ra = r * a
+    return dict(
+        fsr_nm=1e3 * model["wavelength"] ** 2 / (wg["ng"] * L),
+        extinction_ratio=20 * xp.log10((a + r) * (1 - ra) / ((1 + ra) * xp.abs(a - r))),
+        q=np.pi * wg["ng"] * L * xp.sqrt(ra) / (model["wavelength"] * (1 - ra)),
+        wavelength_shift_nm=wg["wavelength_shift_nm"],
+    )
+
+
+def ring_double_figures(
+    xp, samples, model, radius: float, length_x: float, length_y: float
+) -> dict[str, Any]:
+    """Returns FSR, extinction ratio, drop loss, loaded Q and shift of ring_double.
+
+    Args:
+        xp: numpy or jax.numpy.
+        samples: from sample_variations.
+        model: from get_waveguide_model.
+        radius: in um.
+        length_x: coupler straight length in um.
+        length_y: vertical straight length in um.
+    """
+    wg = _waveguide(xp, samples, model)
+    L = 2 * np.pi * radius + 2 * length_x + 2 * length_y
+    k = _coupling(xp, samples, model)
+    r = xp.sqrt(1 - k)
+    a = xp.exp(-wg["alpha"] * L / 2)
+    rra = r * r * a
+    return dict(
+        fsr_nm=1e3 * model["wavelength"] ** 2 / (wg["ng"] * L),
+        extinction_ratio=20
+        * xp.log10((r * a + r) * (1 - rra) / ((1 + rra) * xp.abs(r * a - r))),
+        drop_loss=-10 * xp.log10(k * k * a / (1 - rra) ** 2),
+        q=np.pi * wg["ng"] * L * xp.sqrt(rra) / (model["wavelength"] * (1 - rra)),
+        wavelength_shift_nm=wg["wavelength_shift_nm"],
+    )
+
+
+figures = dict(
+    mzi=mzi_figures,
+    ring_single=ring_single_figures,
+    ring_double=ring_double_figures,
+)
+
+
+@cache
+def _jitted(circuit: str, model: tuple, settings: tuple) -> Callable:
+    import jax
+    import jax.numpy as jnp
+
+    return jax.jit(partial(figures[circuit], jnp, model=dict(model), **dict(settings)))
+
+
+def _evaluate_numpy(circuit, samples, model, settings) -> dict[str, np.ndarray]:
+    with np.errstate(divide="ignore"):
+        return figures[circuit](np, samples, model, **settings)
+
+
+def monte_carlo(
+    circuit: str = "mzi",
+    n: int = 10000,
+    seed: int | None = 0,
+    backend: str | None = None,
+    max_workers: int | None = None,
+    model: dict[str, float] | None = None,
+    variations: dict[str, float] | None = None,
+    **settings,
+) -> pd.DataFrame:
+    """Returns one row per sample with the process variations and figures of merit.
+
+    Args:
+        circuit: mzi, ring_single or ring_double.
+        n: number of samples.
+        seed: random seed.
+        backend: "jax" or "process". Defaults to jax when installed.
+        max_workers: number of worker processes of the process backend,
+            1 runs serially.
+        model: waveguide model, defaults to get_waveguide_model().
+        variations: standard deviations passed to sample_variations.
+
+    Keyword Args:
+        settings: settings of the ubcpdk.components cell, such as delta_length
+            or radius, see get_geometry.
+    """
+    if circuit not in figures:
+        raise ValueError(f"circuit={circuit!r} not in {list(figures)}")
+    model = model or get_waveguide_model()
+    settings = get_geometry(circuit, **settings)
+    samples = sample_variations(n, seed=seed, **(variations or {}))
+
+    if backend is None:
+        try:
+            import jax  # noqa: F401
+
+            backend = "jax"
+        except ImportError:
+            warnings.warn("jax not installed, using the process backend", stacklevel=2)
+            backend = "process"
+
+    if backend == "jax":
+        f = _jitted(
+            circuit, tuple(sorted(model.items())), tuple(sorted(settings.items()))
+        )
+        results = {k: np.asarray(v) for k, v in f(samples).items()}
+    elif backend == "process":
+        if max_workers == 1:
+            results = _evaluate_numpy(circuit, samples, model, settings)
+        else:
+            max_workers = max_workers or os.cpu_count() or 1
+            chunks = np.array_split(np.arange(n), max_workers)
+            spawn = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=spawn
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _evaluate_numpy,
+                        circuit,
+                        {k: v[chunk] for k, v in samples.items()},
+                        model,
+                        settings,
+                    )
+                    for chunk in chunks
+                ]
+                parts = [future.result() for future in futures]
+            results = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    else:
+        raise ValueError(f"backend={backend!r} not in ['jax', 'process']")
+
+    return pd.DataFrame({**samples, **results})
+
+
+def summarize(df: pd.DataFrame, percentiles=(0.05, 0.5, 0.95)) -> pd.DataFrame:
+    """Returns mean, std and percentiles of the figures of merit."""
+    columns = [c for c in df.columns if c not in variation_names]
+    return df[columns].describe(percentiles=list(percentiles)).T
+
+
+if __name__ == "__main__":
+    for circuit in figures:
+        print(circuit)
+        print(summarize(monte_carlo(circuit)))
@@ -0,0 +1,362 @@
+"""Index and loader for the S-parameters in ``PATH.sparameters``.
+
+Every simulation is stored as a ``<component>_<settings hash>`` data file
+(``.npz`` or ``.csv``) next to a ``.yml`` file with the simulation settings
+and, in most files, the component name.
+The index maps (component name, settings hash) to the data file, wavelength
+range, number of ports and compute time. It is cached as JSON under
+``PATH.sparameters_cache`` and only entries whose files changed are read again,
+so lookups never parse YAML.
+
+``load_sparameters`` returns a lazy mapping of port pair to complex array.
+``.npz`` members are extracted once into the cache and memory-mapped,
+``.csv`` magnitude and phase columns are converted on first access.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import re
+import shutil
+import zipfile
+from collections import defaultdict
+from collections.abc import Callable, Iterator, Mapping
+from functools import cache
+from typing import Any, NamedTuple
+
+import numpy as np
+import yaml
+from gdsfactory.typings import PathType
+
+from ubcpdk.cache import (
+    atomic_write_json,
+    file_stat,
+    read_json,
+    temporary_path,
+    text_hash,
+)
+from ubcpdk.config import PATH
+
+index_version = 2
+suffixes = (".npz", ".csv")  # in order of preference
+hash_suffix = re.compile(r"_([0-9a-f]{8}|[0-9a-f]{32})$")
+csv_column = re.compile(r"s(\d)(\d)([am])$")
+
+
+class SparametersEntry(NamedTuple):
+    name: str
+    settings_hash: str
+    filepath: str
+    wavelength_min: float
+    wavelength_max: float
+    wavelength_points: int
+    num_ports: int
+    compute_time_seconds: float | None
+    settings: dict[str, Any]
+
+
+def split_stem(stem: str, name: str | None = None) -> tuple[str, str]:
+    """Returns (component name, settings hash) of an S-parameter filename stem.
+
+    ``ebeam_crossing4_7e264905_524beede`` returns
+    ``("ebeam_crossing4_7e264905", "524beede")``, as component names can end
+    in a hash themselves.
+
+    Args:
+        stem: filename stem.
+        name: component name from the YAML settings, if known.
+    """
+    if name and (stem == name or stem.startswith(f"{name}_")):
+        return name, stem[len(name) + 1 :]
+    match = hash_suffix.search(stem)
+    if not match:
+        return stem, ""
+    return stem[: match.start()], match.group(0)[1:]
+
+
+def _csv_keys(columns: list[str]) -> dict[str, tuple[int, int]]:
+    """Returns port pair key to (magnitude, phase) column indices."""
+    found: dict[tuple[str, str], dict[str, int]] = defaultdict(dict)
+    for i, column in enumerate(columns):
+        if match := csv_column.match(column):
+            found[match.group(1), match.group(2)][match.group(3)] = i
+    return {
+        f"o{i}@0,o{j}@0": (index["m"], index["a"])
+        for (i, j), index in sorted(found.items())
+    }
+
+
+def _read_csv_header(filepath: PathType) -> list[str]:
+    with open(filepath) as f:
+        return f.readline().strip().split(",")
+
+
+def _read_entry(datapath: pathlib.Path, dirpath: pathlib.Path) -> dict[str, Any]:
+    """Returns index entry of a data file, parsing its YAML settings."""
+    ymlpath = datapath.with_suffix(".yml")
+    settings = yaml.safe_load(ymlpath.read_text()) if ymlpath.exists() else None
+    settings = settings or {}
+
+    if datapath.suffix == ".npz":
+        with np.load(datapath) as sp:
+            wavelengths = sp["wavelengths"]
+            ports = {key.split(",")[0] for key in sp.files if "," in key}
+    else:
+        columns = _read_csv_header(datapath)
+        wavelengths = np.loadtxt(
+            datapath,
+            delimiter=",",
+            skiprows=1,
+            usecols=columns.index("wavelengths"),
+            ndmin=1,
+        )
+        ports = {key.split(",")[0] for key in _csv_keys(columns)}
+
+    component = settings.get("component")
+    name = component.get("name") if isinstance(component, dict) else None
+    name, settings_hash = split_stem(datapath.stem, name=name)
+    return SparametersEntry(
+        name=name,
+        settings_hash=settings_hash,
+        filepath=datapath.relative_to(dirpath).as_posix(),
+        wavelength_min=float(np.min(wavelengths)),
+        wavelength_max=float(np.max(wavelengths)),
+        wavelength_points=int(wavelengths.size),
+        num_ports=len(ports),
+        compute_time_seconds=settings.get("compute_time_seconds"),
+        settings={
+            k: v
+            for k, v in settings.items()
+            if isinstance(v, bool | int | float | str) and not k.startswith("compute")
+        },
+    )._asdict()
+
+
+def _data_files(dirpath: pathlib.Path) -> dict[str, pathlib.Path]:
+    """Returns relative stem to data file, preferring .npz over .csv."""
+    files: dict[str, pathlib.Path] = {}
+    for suffix in reversed(suffixes):
+        for datapath in dirpath.rglob(f"*{suffix}"):
+            files[datapath.relative_to(dirpath).with_suffix("").as_posix()] = datapath
+    return files
+
+
+def _preference(entry: SparametersEntry) -> tuple:
+    """Sorts .npz before .csv and top level files before subdirectories."""
+    return (entry.filepath.endswith(".csv"), entry.filepath.count("/"), entry.filepath)
+
+
+class SparametersIndex:
+    """In-memory index of an S-parameters directory.
+
+    Args:
+        dirpath: directory the entry file paths are relative to.
+        entries: index entries.
+    """
+
+    def __init__(self, dirpath: PathType, entries: list[SparametersEntry]) -> None:
+        self.dirpath = pathlib.Path(dirpath)
+        self.entries = entries
+        self._by_name: dict[str, list[SparametersEntry]] = defaultdict(list)
+        self._by_key: dict[tuple[str, str], SparametersEntry] = {}
+        for entry in sorted(entries, key=_preference):
+            self._by_name[entry.name].append(entry)
+            self._by_key.setdefault((entry.name, entry.settings_hash), entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[SparametersEntry]:
+        return iter(self.entries)
+
+    def names(self) -> list[str]:
+        """Returns sorted component names."""
+        return sorted(self._by_name)
+
+    def find(self, name: str, **settings) -> list[SparametersEntry]:
+        """Returns entries of a component matching some simulation settings."""
+        return [
+            entry
+            for entry in self._by_name.get(name, [])
+            if all(entry.settings.get(k) == v for k, v in settings.items())
+        ]
+
+    def get(
+        self, name: str, settings_hash: str | None = None, **settings
+    ) -> SparametersEntry:
+        """Returns one entry of a component.
+
+        Args:
+            name: component name, such as ``ebeam_y_1550``.
+            settings_hash: filename hash. Defaults to the first match.
+
+        Keyword Args:
+            settings: simulation settings to match, such as fiber_angle_deg=31.
+        """
+        if settings_hash is not None and not settings:
+            entry = self._by_key.get((name, settings_hash))
+            entries = [entry] if entry else []
+        else:
+            entries = self.find(name, **settings)
+            if settings_hash is not None:
+                entries = [e for e in entries if e.settings_hash == settings_hash]
+        if not entries:
+            raise KeyError(
+                f"No S-parameters for {name!r} with {settings_hash=} {settings}"
+            )
+        return entries[0]
+
+
+def build_index(
+    dirpath: PathType = PATH.sparameters,
+    cache_dir: PathType = PATH.sparameters_cache,
+) -> SparametersIndex:
+    """Returns index of an S-parameters directory, updating its JSON cache.
+
+    Entries are reused while the mtime and size of their data and YAML files
+    are unchanged.
+
+    Args:
+        dirpath: S-parameters directory.
+        cache_dir: directory of the cached index.
+    """
+    dirpath = pathlib.Path(dirpath).resolve()
+    index_path = pathlib.Path(cache_dir) / f"index_{text_hash(str(dirpath))}.json"
+    cached = read_json(index_path) or {}
+    cached = cached.get("entries", {}) if cached.get("version") == index_version else {}
+
+    records = {}
+    for key, datapath in sorted(_data_files(dirpath).items()):
+        ymlpath = datapath.with_suffix(".yml")
+        stat = [
+            file_stat(datapath),
+            file_stat(ymlpath) if ymlpath.exists() else None,
+        ]
+        record = cached.get(key)
+        if not record or record["stat"] != stat:
+            record = dict(stat=stat, entry=_read_entry(datapath, dirpath))
+        records[key] = record
+
+    if records != cached:
+        atomic_write_json(index_path, dict(version=index_version, entries=records))
+
+    entries = [SparametersEntry(**record["entry"]) for record in records.values()]
+    return SparametersIndex(dirpath, entries)
+
+
+@cache
+def get_index(
+    dirpath: PathType = PATH.sparameters,
+    cache_dir: PathType = PATH.sparameters_cache,
+) -> SparametersIndex:
+    """Returns index of an S-parameters directory, built once per process."""
+    return build_index(dirpath, cache_dir)
+
+
+class LazySparameters(Mapping):
+    """Read-only mapping of key to array that loads each array on first access.
+
+    Args:
+        loaders: key to function returning the array.
+    """
+
+    def __init__(self, loaders: dict[str, Callable[[], np.ndarray]]) -> None:
+        self._loaders = loaders
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key not in self._arrays:
+            self._arrays[key] = self._loaders[key]()
+        return self._arrays[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+
+def _extract_npz(filepath: pathlib.Path, cache_dir: pathlib.Path) -> pathlib.Path:
+    """Returns directory with the .npy members of an .npz file.
+
+    ``np.load`` cannot memory-map compressed .npz members, so they are
+    extracted once. The directory is renamed into place when complete.
+    """
+    stat = file_stat(filepath)
+    key = text_hash(str(filepath.resolve()), stat["mtime_ns"], stat["size"])
+    dirpath = cache_dir / "npz" / f"{filepath.stem}_{key}"
+    if dirpath.exists():
+        return dirpath
+
+    tmp = temporary_path(dirpath.parent)
+    try:
+        with zipfile.ZipFile(filepath) as z:
+            z.extractall(tmp)
+        os.replace(tmp, dirpath)
+    except OSError:
+        if not dirpath.exists():
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return dirpath
+
+
+def _load_csv(filepath: pathlib.Path) -> Mapping[str, np.ndarray]:
+    columns = _read_csv_header(filepath)
+    table = cache(lambda: np.loadtxt(filepath, delimiter=",", skiprows=1, ndmin=2).T)
+
+    def loader(m: int, a: int) -> Callable[[], np.ndarray]:
+        return lambda: table()[m] * np.exp(1j * table()[a])
+
+    loaders = {key: loader(m, a) for key, (m, a) in _csv_keys(columns).items()}
+    loaders["wavelengths"] = lambda: table()[columns.index("wavelengths")]
+    return LazySparameters(loaders)
+
+
+def _load_npz(
+    filepath: pathlib.Path, cache_dir: pathlib.Path
+) -> Mapping[str, np.ndarray]:
+    dirpath = _extract_npz(filepath, cache_dir)
+    return LazySparameters(
+        {
+            npy.stem: lambda npy=npy: np.load(npy, mmap_mode="r")
+            for npy in sorted(dirpath.glob("*.npy"))
+        }
+    )
+
+
+def load_sparameters(
+    filepath: PathType | SparametersEntry,
+    dirpath: PathType = PATH.sparameters,
+    cache_dir: PathType = PATH.sparameters_cache,
+) -> Mapping[str, np.ndarray]:
+    """Returns lazy mapping of ``"o1@0,o2@0"`` style keys to complex arrays.
+
+    The ``wavelengths`` key holds the wavelength in um.
+    CSV columns ``s<i><j>m`` and ``s<i><j>a`` map to ``"o<i>@0,o<j>@0"``.
+
+    Args:
+        filepath: .npz or .csv file, or an index entry.
+        dirpath: directory index entry paths are relative to.
+        cache_dir: directory for the extracted .npz members.
+    """
+    if isinstance(filepath, SparametersEntry):
+        filepath = pathlib.Path(dirpath) / filepath.filepath
+    filepath = pathlib.Path(filepath)
+    if filepath.suffix == ".npz":
+        return _load_npz(filepath, pathlib.Path(cache_dir))
+    return _load_csv(filepath)
+
+
+if __name__ == "__main__":
+    index = get_index()
+    for name in index.names():
+        for entry in index.find(name):
+            print(
+                f"{entry.name:30} {entry.settings_hash:40} {entry.num_ports} ports "
+                f"{entry.wavelength_min}-{entry.wavelength_max} um "
+                f"{entry.compute_time_seconds or 0:8.1f} s"
+            )
+    sp = load_sparameters(index.get("ebeam_y_1550"), dirpath=index.dirpath)
+    print(list(sp), np.abs(sp["o1@0,o2@0"]) ** 2)
@@ -5,17 +5,23 @@
 - constants (WIDTH, CLADDING_OFFSET ...)
 """
 
+import pickle
 import sys
-from functools import partial
+from functools import cache, partial
 
 import gdsfactory as gf
+import gdstk
+import numpy as np
 from gdsfactory.add_pins import add_pin_path
 from gdsfactory.component import Component
+from gdsfactory.component_layout import Label
 from gdsfactory.cross_section import get_cross_sections
+from gdsfactory.polygon import Polygon
 from gdsfactory.technology import LayerLevel, LayerStack
 from gdsfactory.typings import Callable, Layer, LayerSpec, Optional
 from pydantic import BaseModel
 
+from ubcpdk.cache import atomic_write_bytes, file_hash
 from ubcpdk.config import PATH
 
 nm = 1e-3
@@ -133,6 +139,104 @@ add_pins_siepic_metal = partial(
 )
 
 
+def get_hierarchy_layers(component: Component) -> set[tuple[int, int]]:
+    """Returns the polygon and path layers of a component and its subcells.
+
+    Same as component.layers, but reads every unique cell once instead of
+    flattening all the instances of the hierarchy.
+    """
+    top = component._cell
+    layers = set()
+    for cell in [top, *top.dependencies(True)]:
+        if not isinstance(cell, gdstk.Cell):
+            continue
+        layers.update((p.layer, p.datatype) for p in cell.polygons)
+        for path in cell.paths:
+            layers.update(zip(path.layers, path.datatypes))
+    return layers
+
+
+@cache
+def _pin_offsets(orientation: float, pin_length: float) -> np.ndarray:
+    """Returns pin path end points relative to the port center, as add_pin_path."""
+    ca = np.cos(orientation * np.pi / 180)
+    sa = np.sin(orientation * np.pi / 180)
+    rot_mat = np.array([[ca, -sa], [sa, ca]])
+    d0 = np.dot(rot_mat, np.array([-pin_length / 2, 0]))
+    d1 = np.dot(rot_mat, np.array([+pin_length / 2, 0]))
+    offsets = np.array([d0, d1])
+    offsets.flags.writeable = False
+    return offsets
+
+
+def get_pins_bbox(
+    component: Component,
+    port_type: str,
+    layer_pin: Layer | None,
+    pin_length: float,
+    bbox_layer: Layer | None,
+    padding: float,
+) -> tuple:
+    """Returns (DEVREC points or None, pins) of a component.
+
+    Each pin is (path points, width, port name, port center), as add_pin_path.
+
+    Args:
+        component: cell.
+        port_type: of the ports with pins.
+        layer_pin: None for no pins.
+        pin_length: in um.
+        bbox_layer: None for no DEVREC box.
+        padding: around device.
+    """
+    devrec = None
+    (xmin, ymin), (xmax, ymax) = (component.bbox + [[-padding], [padding]]).tolist()
+    # add_polygon skips polygons without area
+    if bbox_layer is not None and xmax > xmin and ymax > ymin:
+        devrec = [[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]]
+
+    pins = []
+    if layer_pin is not None:
+        for p in component.get_ports_list(port_type=port_type):
+            points = p.center + _pin_offsets(p.orientation, pin_length)
+            pins.append((points, p.width, str(p.name), p.center.tolist()))
+    return devrec, pins
+
+
+def add_pins_bbox(
+    component: Component, pins_bbox: tuple, layer_pin: Layer, bbox_layer: Layer
+) -> Component:
+    """Adds the DEVREC box, pin paths and labels of get_pins_bbox in one call."""
+    devrec, pins = pins_bbox
+    elements = [] if devrec is None else [Polygon(devrec, bbox_layer)]
+    for points, width, name, center in pins:
+        elements.append(
+            gdstk.FlexPath(
+                points,
+                width=width,
+                layer=layer_pin[0],
+                datatype=layer_pin[1],
+                simple_path=True,
+                tolerance=1e-3,
+            )
+        )
+        elements.append(
+            Label(
+                text=name,
+                origin=center,
+                anchor="sw",
+                magnification=1.0,
+                rotation=0,
+                layer=layer_pin[0],
+                texttype=layer_pin[1],
+                x_reflection=False,
+            )
+        )
+    component.is_unlocked()
+    component._cell.add(*elements)
+    return component
+
+
 def add_pins_bbox_siepic(
     component: Component,
     function: Callable = add_pin_path,
@@ -145,6 +249,9 @@ def add_pins_bbox_siepic(
 ) -> Component:
     """Add bounding box device recognition layer.
 
+    With the default add_pin_path function the DEVREC box, pin paths and
+    labels are added to the cell at once, see get_pins_bbox.
+
     Args:
         component: to add pins.
         function: to add pins.
@@ -160,10 +267,27 @@ def add_pins_bbox_siepic(
         remove_layers = (layer_pin, bbox_layer, "TEXT")
         c = c.remove_layers(layers=remove_layers)
 
-    if bbox_layer not in c.layers:
+    layer_pin = gf.get_layer(layer_pin)
+    bbox_layer = gf.get_layer(bbox_layer)
+    layers = get_hierarchy_layers(c)
+    add_bbox = bbox_layer not in layers
+    add_pins = layer_pin not in layers and not (add_bbox and layer_pin == bbox_layer)
+
+    if function is add_pin_path and c is component:
+        pins_bbox = get_pins_bbox(
+            c,
+            port_type=port_type,
+            layer_pin=layer_pin if add_pins else None,
+            pin_length=pin_length,
+            bbox_layer=bbox_layer if add_bbox else None,
+            padding=padding,
+        )
+        return add_pins_bbox(c, pins_bbox, layer_pin, bbox_layer)
+
+    if add_bbox:
         c.add_padding(default=padding, layers=(bbox_layer,))
 
-    if layer_pin not in c.layers:
+    if add_pins:
         c = add_pins_siepic(
             component=component,
             function=function,
@@ -267,7 +391,51 @@ class Tech(BaseModel):
 
 TECH = Tech()
 LAYER_STACK = get_layer_stack()
-LAYER_VIEWS = gf.technology.LayerViews(PATH.lyp_yaml)
+
+
+layer_views_cache_version = 1
+
+
+@cache
+def get_layer_views(
+    filepath=PATH.lyp_yaml, cache_dir=PATH.cache / "layer_views"
+) -> gf.technology.LayerViews:
+    """Returns LayerViews from layers.yaml.
+
+    The parsed LayerViews is pickled in cache_dir, keyed by the YAML contents
+    and the gdsfactory version, so later processes skip the YAML parsing and
+    pydantic validation. Falls back to parsing when the YAML changes.
+
+    Args:
+        filepath: layer views YAML file.
+        cache_dir: directory for the pickled LayerViews. None disables the cache.
+    """
+    if cache_dir is None:
+        return gf.technology.LayerViews(filepath)
+
+    key = file_hash(filepath)[:16]
+    cache_path = cache_dir / f"layer_views_{key}.pkl"
+    version = (layer_views_cache_version, gf.config.__version__)
+
+    try:
+        cached_version, layer_views = pickle.loads(cache_path.read_bytes())
+        if cached_version == version:
+            return layer_views
+    except Exception:
+        pass
+
+    layer_views = gf.technology.LayerViews(filepath)
+    try:
+        atomic_write_bytes(cache_path, pickle.dumps((version, layer_views)))
+    except OSError:
+        pass
+    return layer_views
+
+
+def __getattr__(name: str):
+    if name == "LAYER_VIEWS":
+        return get_layer_views()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 strip_wg_simulation_info = dict(
@@ -346,7 +514,7 @@ if __name__ == "__main__":
     # LAYER_VIEWS = gf.technology.LayerViews(filepath=PATH.lyp)
     # LAYER_VIEWS.to_yaml(PATH.layers_yaml)
     # LAYER_VIEWS = gf.technology.LayerViews(PATH.lyp_yaml)
-    LAYER_VIEWS.to_lyp(PATH.lyp)
+    get_layer_views().to_lyp(PATH.lyp)
     # c = gf.c.mzi()
     # c = gf.c.straight(length=1, cross_section=strip)
     # c = gf.c.bend_euler(cross_section=strip)